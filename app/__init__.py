@@ -1,14 +1,19 @@
-from flask import Flask
-from flask_cors import CORS
-from .routes.bigquery_routes import bigquery_bp
-from .routes.queries_routes import queries_bp
-from .routes.schema_scoring_routes import score_schema_bp
-from .services.upload_service_account import upload_bp
+from flask import Flask, jsonify
+from .utils.json_provider import OrjsonProvider
 from .utils.logging_config import configure_logging
 
 def create_app():
+    # Blueprints (and the SDKs they pull in) are imported here rather than at
+    # module level so that `import app` stays cheap on cold starts.
+    from flask_cors import CORS
+    from .routes.bigquery_routes import bigquery_bp
+    from .routes.queries_routes import queries_bp
+    from .routes.schema_scoring_routes import score_schema_bp
+    from .services.upload_service_account import upload_bp
+
     app = Flask(__name__)
     app.config.from_object('config.Config')
+    app.json = OrjsonProvider(app)
     app.secret_key = "some-unique-secret"
 
     # Important for cross-origin cookies in modern browsers
@@ -18,6 +23,14 @@ def create_app():
     # Configure logging
     configure_logging(app)
 
+    @app.errorhandler(413)
+    def payload_too_large(_exc):
+        """JSON body for requests over MAX_CONTENT_LENGTH."""
+        return jsonify({
+            'error': 'Payload Too Large',
+            'message': 'The request body exceeds the maximum allowed size'
+        }), 413
+
     # Apply CORS globally with specific configuration
     CORS(
         app,
@@ -25,6 +38,8 @@ def create_app():
         supports_credentials=True,
         allow_headers=["Content-Type", "Authorization"],
         expose_headers=["Content-Length", "X-Custom-Header"],
+        max_age=86400,  # let browsers reuse preflight responses for 24h
+        automatic_options=True,  # answer OPTIONS preflights without entering the views
     )
 
     # Register Blueprints
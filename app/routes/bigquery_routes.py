@@ -3,25 +3,21 @@
 Blueprint module providing endpoints for BigQuery metadata and schema.
 """
 
-from flask import Blueprint, jsonify, request, session
-from flask_cors import cross_origin
+from flask import Blueprint, Response, current_app, jsonify, request
 from google.api_core.exceptions import BadRequest, GoogleAPICallError
 
-
-# Import your existing helper functions from bigquery_service.py
-# BUT you'll modify them to accept a 'client' param rather than
-# creating their own client from foreign-connect.json
 from ..services.bigquery_service import (
-    get_bigquery_info, 
-    flatten_bq_schema,
+    get_bigquery_info,
+    invalidate_bigquery_info,
+    iter_flat_bq_schema,
     dry_run_query,
     get_bigquery_client_from_session
 )
+from ..utils.streaming import iter_json_array
 
 bigquery_bp = Blueprint("bigquery_bp", __name__)
 
 
-
 @bigquery_bp.route("/bigquery_info", methods=["GET"])
 def bigquery_info():
     """
@@ -30,27 +26,44 @@ def bigquery_info():
     """
 
     try:
-        current_sa_json = session.get("service_account_json")
-        # print("DEBUG: session service_account_json:", current_sa_json)
         # Build a client from the user's session-based service account
         client = get_bigquery_client_from_session()
 
-        # We updated get_bigquery_info(...) so it takes a client param
-        response, status_code = get_bigquery_info(client)
+        # Flatten the project info dict directly; no JSON round trip needed.
+        # The flat schema is encoded row by row as the response is sent.
+        project_info = get_bigquery_info(
+            client, max_workers=current_app.config["BIGQUERY_MAX_WORKERS"]
+        )
+        return Response(
+            iter_json_array(iter_flat_bq_schema(project_info), key="schema"),
+            status=200,
+            mimetype="application/json"
+        )
+    except Exception as exc:
+        current_app.logger.exception("bigquery_info error")
+        return jsonify({"error": str(exc)}), 500
 
-        # If 200, flatten the JSON
-        if status_code == 200:
-            data_dict = response.get_json()
-            flattened_schema = flatten_bq_schema(data_dict)
-            return jsonify({"schema": flattened_schema}), 200
 
-        return response, status_code
+@bigquery_bp.route("/bigquery_info/refresh", methods=["POST"])
+def bigquery_info_refresh():
+    """
+    Discard the session principal's cached BigQuery metadata of its project
+    so the next /bigquery_info call reflects schema changes immediately.
+    """
+    try:
+        client = get_bigquery_client_from_session()
+        removed = invalidate_bigquery_info(client)
+        return jsonify({
+            "message": "BigQuery metadata cache cleared.",
+            "project_id": client.project,
+            "entries_removed": removed
+        }), 200
     except Exception as exc:
-        print("DEBUG: bigquery_info error:", exc)
+        current_app.logger.exception("bigquery_info refresh error")
         return jsonify({"error": str(exc)}), 500
 
 
-@bigquery_bp.route("/dry_run", methods=["POST", "OPTIONS"])
+@bigquery_bp.route("/dry_run", methods=["POST"])
 def dry_run_route():
     """
     Handle requests for performing a BigQuery dry run using the user's
@@ -58,15 +71,8 @@ def dry_run_route():
     Expects JSON body with a 'query' key:
       { "query": "SELECT * FROM `project.dataset.table`" }
     """
-    if request.method == "OPTIONS":
-        # Handle CORS preflight request if necessary
-        headers = {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Max-Age": "3600",
-        }
-        return "", 204, headers
+    if not request.is_json:
+        return jsonify({"error": "Expected application/json"}), 415
 
     data = request.get_json()
     if not data or "query" not in data:
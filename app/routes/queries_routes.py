@@ -1,76 +1,101 @@
-from flask import Blueprint, jsonify, request
-from flask_cors import cross_origin
+import re
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 
 from ..services.openai_sql_service import generate_sql_from_question
 from ..services.bigquery_service import get_queries, get_bigquery_client_from_session
-from ..services.openai_service import generate_natural_language_question
+from ..services.openai_service import generate_natural_language_questions
+from ..utils.streaming import iter_json_array
 
 
 queries_bp = Blueprint('queries_bp', __name__)
 
+
+# '<n> day', '<n> days' or a bare number of days
+_INTERVAL_RE = re.compile(r"\s*(\d{1,4})(?:\s+days?)?\s*", re.IGNORECASE)
+
+
+def _interval_days(time_interval):
+    """Parse a '<n> day' interval (e.g. '90 day') into a number of days."""
+    match = _INTERVAL_RE.fullmatch(time_interval)
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+def _invalid_interval():
+    """400 response for a malformed time_interval argument."""
+    return jsonify({"error": "time_interval must look like '<n> day'"}), 400
+
+
 @queries_bp.route('/queries', methods=['GET'])
 def queries():
     """Route to get queries"""
-    time_interval = request.args.get('time_interval', '90 day')
-    query_counts = get_queries(time_interval)
-    
-    queries_list = []
-    for q, data in query_counts.items():
-        queries_list.append({
-            "query": q,
-            "count": data["count"],
-            "job_type": data["job_type"],
-            "statement_type": data["statement_type"],
-            "creation_time": data["creation_time"],
-            "avg_total_bytes_processed": data["avg_total_bytes_processed"],
-            "avg_execution_time": data["avg_execution_time"]
-        })
-
-    return jsonify(queries_list)
+    days = _interval_days(request.args.get('time_interval', '90 day'))
+    if days is None:
+        return _invalid_interval()
+    client = get_bigquery_client_from_session()
+    query_rows = get_queries(client, days)
+
+    rows = (row._asdict() for row in query_rows)
+    return Response(iter_json_array(rows), mimetype='application/json')
 
 @queries_bp.route('/questions', methods=['GET'])
 def questions():
     """Route to get query corresponding questions"""
-    time_interval = request.args.get('time_interval', '90 day')
-    query_counts = get_queries(time_interval)
-    
-    questions_list = []
-    for query_text, data in query_counts.items():
-        question = generate_natural_language_question(query_text)
-        questions_list.append({
-            "question": question,
-            "query": query_text,
-            "count": data["count"],
-            "creation_time": data["creation_time"],
-            "avg_total_bytes_processed": data["avg_total_bytes_processed"],
-            "avg_execution_time": data["avg_execution_time"]
-            # add more fields here if you'd like
-        })
-    return jsonify(questions_list)
+    days = _interval_days(request.args.get('time_interval', '90 day'))
+    if days is None:
+        return _invalid_interval()
+    client = get_bigquery_client_from_session()
+    query_rows = get_queries(client, days)
+    max_workers = current_app.config["OPENAI_QUESTION_WORKERS"]
+
+    def rows():
+        generated = generate_natural_language_questions(
+            (row.query for row in query_rows), max_workers=max_workers
+        )
+        for row, question in zip(query_rows, generated):
+            yield {
+                "question": question,
+                "query": row.query,
+                "count": row.count,
+                "creation_time": row.creation_time,
+                "avg_total_bytes_processed": row.avg_total_bytes_processed,
+                "avg_execution_time": row.avg_execution_time
+                # add more fields here if you'd like
+            }
+
+    return Response(stream_with_context(iter_json_array(rows())), mimetype='application/json')
 
 @queries_bp.route('/queries_and_questions', methods=['GET'])
 def queries_and_questions():
     """Route to get question-query pairs"""
-    time_interval = request.args.get('time_interval', '90 day')
-    query_counts = get_queries(time_interval)
-    
-    results = []
-    for query_text, data in query_counts.items():
-        question = generate_natural_language_question(query_text)
-        results.append({
-            "query": query_text,
-            "question": question,
-            "count": data["count"],
-            "statement_type": data["statement_type"],
-            "creation_time": data["creation_time"],
-            "avg_total_bytes_processed": data["avg_total_bytes_processed"],
-            "avg_execution_time": data["avg_execution_time"]
-        })
-    return jsonify(results)
+    days = _interval_days(request.args.get('time_interval', '90 day'))
+    if days is None:
+        return _invalid_interval()
+    client = get_bigquery_client_from_session()
+    query_rows = get_queries(client, days)
+    max_workers = current_app.config["OPENAI_QUESTION_WORKERS"]
+
+    def rows():
+        generated = generate_natural_language_questions(
+            (row.query for row in query_rows), max_workers=max_workers
+        )
+        for row, question in zip(query_rows, generated):
+            yield {
+                "query": row.query,
+                "question": question,
+                "count": row.count,
+                "statement_type": row.statement_type,
+                "creation_time": row.creation_time,
+                "avg_total_bytes_processed": row.avg_total_bytes_processed,
+                "avg_execution_time": row.avg_execution_time
+            }
+
+    return Response(stream_with_context(iter_json_array(rows())), mimetype='application/json')
 
 
 @queries_bp.route('/generate_sql', methods=['POST'])
-# @cross_origin()
 def generate_sql_endpoint():
     """
     POST endpoint:
@@ -84,7 +109,10 @@ def generate_sql_endpoint():
         "sql": "SELECT * FROM `project.dataset.table` WHERE name = 'Bob';"
       }
     """
-    data = request.get_json()
+    if not request.is_json:
+        return jsonify({"error": "Expected application/json"}), 415
+
+    data = request.get_json(cache=False)
     if not data:
         return jsonify({"error": "No JSON body found"}), 400
 
@@ -1,19 +1,23 @@
+import logging
 
-from flask import Blueprint, jsonify, request
-from flask_cors import CORS
-from ..services.scoring_service import score_gen_ai
+from flask import Blueprint, current_app, jsonify, request
 
 score_schema_bp = Blueprint('score_schema_bp', __name__)
 
-# Enable CORS for this blueprint
-CORS(score_schema_bp)
-
 @score_schema_bp.route('/score_schema', methods=['POST'])
 def score_schema():
     """score schema on each attribute quaity, field name quality, field description presence, primary and foreign keys, field types, field similarity"""
-    try:
-        data = request.get_json()
+    if not request.is_json:
+        return jsonify({
+            'error': 'Unsupported Media Type',
+            'message': 'Expected a JSON request body (application/json)'
+        }), 415
 
+    # Parsed outside the try below, so an oversized (413) or malformed (400)
+    # body is answered as such rather than as a 500
+    data = request.get_json(cache=False)
+
+    try:
         if not data or 'schema' not in data:
             return jsonify({
                 'error': 'Bad Request',
@@ -28,6 +32,13 @@ def score_schema():
                 'message': 'The "schema" field must be a list'
             }), 422
 
+        if not schema:
+            # Nothing to score; skip loading the NLP models entirely
+            return jsonify({
+                'error': 'Invalid Format',
+                'message': 'The "schema" field must be a non-empty list'
+            }), 422
+
         # dict of only the parameters that were actually provided
         score_params = {}
         if 'similarity_threshold' in data:
@@ -39,13 +50,20 @@ def score_schema():
         if 'weights_override' in data:
             score_params['weights_override'] = data['weights_override']
 
-        print("Received schema with length:", len(schema))
-        print("Optional parameters (only those passed):", score_params)
+        logger = current_app.logger
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received schema with length: %d", len(schema))
+            logger.debug("Optional parameters (only those passed): %s", score_params)
+
+        # Imported lazily: loading the spaCy / SentenceTransformer models is the
+        # most expensive part of startup and only this endpoint needs them.
+        from ..services.scoring_service import score_gen_ai  # pylint: disable=import-outside-toplevel
 
         # Now call score_gen_ai with schema plus the present optional parameters:
         scores = score_gen_ai(schema, **score_params)
 
-        print("Detailed Score:", scores)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Detailed Score: %s", scores)
 
         return jsonify(scores), 200
 
@@ -2,25 +2,175 @@
 Module providing functions and queries to interact with a BigQuery database.
 """
 
+import functools
+import hashlib
 import logging
-import re
+import operator
 import os
-from flask import json, jsonify, session
-from google.cloud import bigquery
-from ..utils.logging_config import logger
+import threading
+import uuid
+import weakref
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+import orjson
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from flask import session
+from google.api_core.exceptions import Forbidden, GoogleAPICallError, NotFound
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import bigquery
 from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+from ..utils.logging_config import logger
+
+
+# Keep-alive connections each cached client holds open to the BigQuery API.
+# The requests default of 10 is below the worker count get_bigquery_info may
+# use, which makes parallel calls drop and re-open TCP/TLS connections.
+HTTP_POOL_SIZE = 32
+
+# Page size for list_datasets / list_tables (the API maximum is 1000)
+LIST_PAGE_SIZE = 1000
+
+# Rows fetched per page when reading query results
+QUERY_RESULTS_PAGE_SIZE = 10_000
+
+# Most distinct queries returned by get_queries. Bounds the memory held per
+# cached result and the number of questions a single request can generate.
+QUERY_HISTORY_MAX_ROWS = 10_000
+
+# The @max_rows most frequent distinct queries run in the project over the
+# last @days days
+_QUERY_HISTORY_SQL = """
+    SELECT
+      query,
+      ANY_VALUE(job_type) AS job_type,
+      ANY_VALUE(statement_type) AS statement_type,
+      MAX(creation_time) AS creation_time,
+      AVG(total_bytes_processed) AS avg_total_bytes_processed,
+      AVG(query_info.performance_insights.avg_previous_execution_ms) AS avg_execution_time,
+      COUNT(*) AS query_count
+    FROM region-us.INFORMATION_SCHEMA.JOBS_BY_PROJECT
+    WHERE
+      creation_time > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @days DAY)
+      AND state = 'DONE'
+      AND job_type = 'QUERY'
+      AND NOT REGEXP_CONTAINS(LOWER(query), r'\\binformation_schema\\b')
+    GROUP BY
+      query
+    ORDER BY
+      query_count DESC
+    LIMIT @max_rows
+"""
+
+# One aggregated row of query history, as returned by get_queries
+QueryRow = namedtuple(
+    "QueryRow",
+    "query count job_type statement_type creation_time "
+    "avg_total_bytes_processed avg_execution_time"
+)
+
+
+# Uploaded service account JSON, keyed by the random ID stored in the
+# session cookie so the key material never leaves the server. The store is
+# per process: fine for the single-process `flask run` deployment, but a
+# multi-worker server needs a shared store instead.
+SERVICE_ACCOUNT_TTL = 12 * 3600
+_service_account_store = TTLCache(maxsize=1024, ttl=SERVICE_ACCOUNT_TTL)
+_service_account_store_lock = threading.Lock()
+
+
+def store_service_account(sa_json: dict) -> str:
+    """Keep an uploaded service account server-side and return its ID."""
+    sa_id = uuid.uuid4().hex
+    with _service_account_store_lock:
+        _service_account_store[sa_id] = sa_json
+    return sa_id
+
 
+def _session_service_account():
+    """Return the service account uploaded in this session, or None."""
+    sa_id = session.get("sa_id")
+    if not sa_id:
+        return None
+    with _service_account_store_lock:
+        return _service_account_store.get(sa_id)
+
+
+# BigQuery clients keyed by service account key (see _credential_key), so
+# the credentials are parsed and the HTTP transport is built once per key
+# rather than on every request.
+_client_cache = TTLCache(maxsize=128, ttl=1800)
+_client_cache_lock = threading.Lock()
+
+# Credential key each cached client was built from, for keying the result
+# caches per principal (see _credential_identity)
+_client_identities = weakref.WeakKeyDictionary()
+
+
+def _credential_key(sa_json: dict) -> tuple:
+    """
+    Identify a service account key by its email and a digest of the private
+    key itself. The email and private_key_id are public, so keying on them
+    alone would hand an authenticated client to anyone who knows them.
+    """
+    private_key = sa_json.get("private_key") or ""
+    digest = hashlib.blake2b(private_key.encode(), digest_size=16).hexdigest()
+    return (sa_json.get("client_email"), digest)
+
+
+def _credential_identity(client: bigquery.Client):
+    """
+    The principal a client authenticates as, for cache keys shared between
+    sessions. A client not built by _client_from_service_account_info is
+    its own identity, so its results are never shared.
+    """
+    return _client_identities.get(client, client)
+
+
+def _client_from_service_account_info(sa_json: dict) -> bigquery.Client:
+    """
+    Return a (cached) BigQuery client for the given service account JSON.
+    """
+    key = _credential_key(sa_json)
+
+    with _client_cache_lock:
+        client = _client_cache.get(key)
+    if client is not None:
+        return client
+
+    creds = service_account.Credentials.from_service_account_info(sa_json)
+    http = AuthorizedSession(creds)
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    http.mount("https://", adapter)
+    client = bigquery.Client(credentials=creds, project=creds.project_id, _http=http)
+
+    with _client_cache_lock:
+        # Another request may have built one concurrently; keep the first.
+        client = _client_cache.setdefault(key, client)
+        _client_identities[client] = key
+    return client
+
+
+@functools.lru_cache(maxsize=4)
+def _load_local_service_account(path: str, mtime: float) -> dict:  # pylint: disable=unused-argument
+    """
+    Parse the local service account file. The modification time is part of
+    the cache key, so a rotated key file is picked up on the next request.
+    """
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def get_bigquery_client_from_session():
     """
     Retrieve a BigQuery client from:
-      1) The user's session-based service account JSON, if present.
+      1) The service account uploaded in the user's session, if present.
       2) Otherwise, fall back to a local service_account.json file in app/ folder.
       3) If neither is available, raise an exception.
     """
-    sa_json = session.get("service_account_json")
+    sa_json = _session_service_account()
 
     if not sa_json:
         # Fallback: check if there's a local service_account.json in app/ directory
@@ -30,80 +180,160 @@ def get_bigquery_client_from_session():
             "service_account.json"
         )
 
-        if os.path.exists(service_account_path):
-            with open(service_account_path, "r", encoding="utf-8") as f:
-                sa_json = json.load(f)
-        else:
+        try:
+            mtime = os.path.getmtime(service_account_path)
+        except OSError:
             raise Exception(
-                "No service account available in session and no local service_account.json found in app/. "
+                "No service account available in session (or it has expired) and no local "
+                "service_account.json found in app/. "
                 "Please upload one via /upload_service_account."
-            )
+            ) from None
+        sa_json = _load_local_service_account(service_account_path, mtime)
+
+    # Convert the JSON into credentials and build (or reuse) a BigQuery client
+    return _client_from_service_account_info(sa_json)
+
+
+@cached(
+    TTLCache(maxsize=32, ttl=60),
+    key=lambda client, days=10, max_rows=QUERY_HISTORY_MAX_ROWS: hashkey(
+        _credential_identity(client), client.project, days, max_rows
+    ),
+    lock=threading.Lock(),
+)
+def get_queries(
+    client: bigquery.Client,
+    days: int = 10,
+    max_rows: int = QUERY_HISTORY_MAX_ROWS
+) -> list:
+    """
+    Call a query to get historical queries from the past `days` days.
+    Returns one QueryRow per distinct query text, with metadata such as count,
+    avg bytes, avg exec time, etc., most frequently run queries first.
 
-    # Convert the JSON into credentials and build a BigQuery client
-    creds = service_account.Credentials.from_service_account_info(sa_json)
-    return bigquery.Client(credentials=creds, project=creds.project_id)
+    Results are cached per (principal, project, days, max_rows) for 60
+    seconds so that /queries, /questions and /queries_and_questions called
+    back to back share a single INFORMATION_SCHEMA scan, without serving one
+    service account's history to another. The returned list must not be
+    mutated.
+
+    :param client: A BigQuery client.
+    :type client: bigquery.Client
+    :param days: How many days of query history to aggregate.
+    :type days: int
+    :param max_rows: Maximum number of distinct queries to return.
+    :type max_rows: int
+    :return: List of queries and their aggregated information.
+    :rtype: list[QueryRow]
+    """
+    # The window is passed as a query parameter, so the SQL text is constant
+    # and no caller-supplied string is ever spliced into it
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("days", "INT64", days),
+            bigquery.ScalarQueryParameter("max_rows", "INT64", max_rows),
+        ],
+        use_query_cache=True,
+        use_legacy_sql=False
+    )
+    query_job = client.query(_QUERY_HISTORY_SQL, job_config=job_config)
+
+    # Build rows column-wise from Arrow instead of going through one
+    # bigquery.Row object per result
+    table = _result_to_arrow(query_job)
+    columns = [
+        table.column(name).to_pylist()
+        for name in (
+            "query",
+            "query_count",
+            "job_type",
+            "statement_type",
+            "creation_time",
+            "avg_total_bytes_processed",
+            "avg_execution_time",
+        )
+    ]
+    return list(map(QueryRow._make, zip(*columns)))
 
 
-def get_queries(client: bigquery.Client, time_interval="10 day") -> dict:
+def _result_to_arrow(query_job):
     """
-    Call a query to get historical queries from the past `time_interval`.
-    Returns a dict keyed by query text, with metadata such as count, avg bytes,
-    avg exec time, etc.
+    Download a finished query's results as a pyarrow.Table, through the
+    BigQuery Storage Read API when the result is large enough to benefit.
 
-    :param client: A BigQuery client.
-    :type client: bigquery.Client
-    :param time_interval: The time interval for querying historical data.
-    :type time_interval: str
-    :return: Dictionary of queries and their aggregated information.
-    :rtype: dict
+    The Storage API needs the bigquery.readsessions.create permission; if the
+    service account lacks it the results are read over REST instead. Errors
+    of the query itself propagate without a retry.
     """
-    query = f"""
-        SELECT
-          query,
-          ANY_VALUE(job_type) AS job_type,
-          ANY_VALUE(statement_type) AS statement_type,
-          MAX(creation_time) AS creation_time,
-          AVG(total_bytes_processed) AS avg_total_bytes_processed,
-          AVG(query_info.performance_insights.avg_previous_execution_ms) AS avg_execution_time,
-          COUNT(*) AS query_count
-        FROM region-us.INFORMATION_SCHEMA.JOBS_BY_PROJECT
-        WHERE
-          creation_time > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {time_interval})
-          AND state = 'DONE'
-          AND job_type = 'QUERY'
-          AND NOT REGEXP_CONTAINS(LOWER(query), r'\\binformation_schema\\b')
-        GROUP BY
-          query
-    """
-
-    client = get_bigquery_client_from_session()
-    query_job = client.query(query)
-    
-    # Initialize a dictionary to hold query -> metadata
-    query_data = {}
-
-    for row in query_job.result():
-        query_text = row.query
-        query_data[query_text] = {
-            "job_type": row.job_type,
-            "statement_type": row.statement_type,
-            "creation_time": row.creation_time,
-            "avg_total_bytes_processed": row.avg_total_bytes_processed,
-            "avg_execution_time": row.avg_execution_time,
-            "count": row.query_count
-        }
+    rows = query_job.result(page_size=QUERY_RESULTS_PAGE_SIZE)
+    try:
+        return rows.to_arrow(create_bqstorage_client=True)
+    except Forbidden as exc:
+        # Raised when the read session cannot be created
+        logger.warning(
+            "BigQuery Storage API unavailable, reading results over REST: %s", str(exc)
+        )
+        return rows.to_arrow(create_bqstorage_client=False)
+
+
+def _shard_prefix(table_id: str):
+    """
+    Return the prefix of a date-sharded table ID up to and including the
+    underscore (events_20240101 -> events_), or None for other tables.
+
+    The suffix is fixed-width, so a slice check replaces the regex
+    ^(.*)_\d{8}$ (isdecimal matches the \d class) and rejects the common,
+    unsharded case after one or two character comparisons.
+    """
+    if len(table_id) >= 9 and table_id[-9] == "_" and table_id[-8:].isdecimal():
+        return table_id[:-8]
+    return None
+
+
+def _list_tables(client: bigquery.Client, dataset_id: str) -> list:
+    """Materialize the (paginated) table listing of a dataset."""
+    return list(client.list_tables(dataset_id, page_size=LIST_PAGE_SIZE))
 
-    return query_data
 
-def get_bigquery_info(client: bigquery.Client):
+def _bigquery_info_key(client, max_workers):  # pylint: disable=unused-argument
+    """Cache key for get_bigquery_info; the worker count does not change the result."""
+    return hashkey(_credential_identity(client), client.project)
+
+
+# Project metadata, keyed by _bigquery_info_key (principal, then project)
+_bigquery_info_cache = TTLCache(maxsize=32, ttl=300)
+_bigquery_info_lock = threading.Lock()
+
+
+@cached(_bigquery_info_cache, key=_bigquery_info_key, lock=_bigquery_info_lock)
+def get_bigquery_info(
+    client: bigquery.Client,
+    max_workers: int
+):
     """
     Retrieve BigQuery metadata, including project ID, datasets, tables,
     and each table's field information (including constraints if available).
 
+    Constraint lookups, table listings and schema lookups are independent
+    round trips, so they are fanned out over a thread pool (the BigQuery
+    client is thread-safe for these read calls). Schemas come from a single
+    INFORMATION_SCHEMA query per dataset (see get_columns) rather than one
+    get_table call per table. Datasets and tables keep the order in which
+    BigQuery lists them.
+
+    Results are cached per (principal, project) for five minutes, or until
+    invalidate_bigquery_info is called with a client of the same principal
+    and project.
+    The returned dict is shared between callers and must not be mutated.
+
     :param client: A BigQuery client (user-specific or default).
     :type client: bigquery.Client
-    :return: A Flask response (JSON) with project info, or an error response.
-    :rtype: Tuple[flask.Response, int]
+    :param max_workers: Maximum number of concurrent BigQuery API calls
+        (the BIGQUERY_MAX_WORKERS setting).
+    :type max_workers: int
+    :return: Project info with datasets, tables and enriched fields.
+    :rtype: dict
+    :raises: Exception if listing datasets or tables fails.
     """
     try:
         project_id = client.project
@@ -114,247 +344,587 @@ def get_bigquery_info(client: bigquery.Client):
             "datasets": []
         }
 
-        datasets = list(client.list_datasets())
+        datasets = list(client.list_datasets(page_size=LIST_PAGE_SIZE))
         if not datasets:
             logger.info("No datasets found in project: %s", project_id)
-            return jsonify(project_info), 200
-
-        # Pre-fetch constraints for each dataset
-        constraints_data = {}
-        for dataset in datasets:
-            dataset_id = dataset.dataset_id
-            logger.info("Fetching constraints for dataset: %s", dataset_id)
-            constraints = get_constraints(client, dataset_id)
-            constraints_data[dataset_id] = constraints
-
-        # Build project_info
-        shard_pattern = re.compile(r'^(.*)_\d{8}$')
-
-        for dataset in datasets:
-            dataset_id = dataset.dataset_id
-            logger.info("Processing dataset: %s", dataset_id)
-            dataset_info = {
-                "dataset_id": dataset_id,
-                "tables": []
-            }
+            return project_info
 
-            tables = client.list_tables(dataset_id)
-            if not tables:
-                logger.info("No tables found in dataset: %s", dataset_id)
-                project_info["datasets"].append(dataset_info)
-                continue
+        dataset_ids = [dataset.dataset_id for dataset in datasets]
 
-            # Track which normalized table has been added
-            seen_normalized = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Constraints for the whole project (one job) and table listings
+            # for every dataset, concurrently
+            constraints_future = executor.submit(
+                get_project_constraints, client, dataset_ids
+            )
+            listing_futures = {
+                dataset_id: executor.submit(_list_tables, client, dataset_id)
+                for dataset_id in dataset_ids
+            }
 
-            for table in tables:
-                original_table_id = table.table_id
-                logger.info(
-                    "Processing table: %s in dataset: %s",
-                    original_table_id,
-                    dataset_id
+            # Pick one representative table per normalized table id and
+            # fetch the dataset's schemas as soon as its listing is available
+            table_representatives = {}
+            column_futures = {}
+            debug = logger.isEnabledFor(logging.DEBUG)
+            for dataset_id in dataset_ids:
+                tables = listing_futures[dataset_id].result()
+                if not tables:
+                    logger.info("No tables found in dataset: %s", dataset_id)
+
+                # First (representative) table seen per normalized table id,
+                # in listing order
+                representatives = {}
+
+                for table in tables:
+                    original_table_id = table.table_id
+                    if debug:
+                        logger.debug(
+                            "Processing table: %s in dataset: %s",
+                            original_table_id,
+                            dataset_id
+                        )
+                    # Date-sharded tables (e.g. events_20240101) are reported
+                    # once as events_*
+                    shard_prefix = _shard_prefix(original_table_id)
+                    if shard_prefix is None:
+                        normalized_table_id = original_table_id
+                    else:
+                        normalized_table_id = shard_prefix + "*"
+
+                    # If we've already handled this normalized table, skip
+                    if normalized_table_id in representatives:
+                        if debug:
+                            logger.debug(
+                                "Skipping table %s because we already have %s",
+                                original_table_id,
+                                normalized_table_id
+                            )
+                        continue
+
+                    representatives[normalized_table_id] = original_table_id
+
+                table_representatives[dataset_id] = representatives
+                # One INFORMATION_SCHEMA query per dataset for all of its schemas
+                if representatives:
+                    column_futures[dataset_id] = executor.submit(
+                        get_columns,
+                        client,
+                        dataset_id,
+                        list(representatives.values())
+                    )
+
+            constraints_by_dataset = constraints_future.result()
+            if constraints_by_dataset is None:
+                # The project-wide query failed (e.g. datasets in several
+                # locations); fall back to one query per dataset
+                constraint_futures = {
+                    dataset_id: executor.submit(get_constraints, client, dataset_id)
+                    for dataset_id in dataset_ids
+                }
+                constraints_by_dataset = {
+                    dataset_id: future.result()
+                    for dataset_id, future in constraint_futures.items()
+                }
+
+            # Build project_info
+            for dataset_id in dataset_ids:
+                logger.debug("Processing dataset: %s", dataset_id)
+                dataset_info = {
+                    "dataset_id": dataset_id,
+                    "tables": []
+                }
+                dataset_constraints = constraints_by_dataset.get(
+                    dataset_id, _EMPTY_CONSTRAINTS
                 )
-                # Check if it matches the shard pattern (e.g. table_YYYYMMDD)
-                match = shard_pattern.match(original_table_id)
-                if match:
-                    normalized_table_id = f"{match.group(1)}_*"
-                else:
-                    normalized_table_id = original_table_id
-
-                # If we've already handled this normalized table, skip
-                if normalized_table_id in seen_normalized:
-                    logger.info(
-                        "Skipping table %s because we already have %s",
-                        original_table_id,
-                        normalized_table_id
+                representatives = table_representatives[dataset_id]
+
+                columns_by_table = {}
+                if dataset_id in column_futures:
+                    # None if INFORMATION_SCHEMA could not be queried
+                    columns_by_table = column_futures[dataset_id].result() or {}
+
+                # Tables without fields from INFORMATION_SCHEMA (all of them
+                # if it was unavailable) fall back to one get_table call each
+                schema_futures = {
+                    original_table_id: executor.submit(
+                        client.get_table,
+                        client.dataset(dataset_id).table(original_table_id)
+                    )
+                    for original_table_id in representatives.values()
+                    if original_table_id not in columns_by_table
+                }
+
+                for normalized_table_id, original_table_id in representatives.items():
+                    # Retrieve schema and constraints for this table
+                    if original_table_id in columns_by_table:
+                        table_field_info = columns_by_table[original_table_id]
+                    else:
+                        table_obj = schema_futures[original_table_id].result()
+                        table_field_info = get_field_info(table_obj.schema)
+
+                    # Resolve the table's key columns once, not per field
+                    pk_set = dataset_constraints["primary_keys"].get(
+                        original_table_id, _NO_KEYS
+                    )
+                    fk_set = dataset_constraints["foreign_keys"].get(
+                        original_table_id, _NO_KEYS
                     )
-                    continue
+                    enriched_fields = enrich_fields(table_field_info, pk_set, fk_set)
 
-                # Mark as seen
-                seen_normalized.add(normalized_table_id)
+                    dataset_info["tables"].append({
+                        "table_id": normalized_table_id,
+                        "fields": enriched_fields
+                    })
 
-                # Retrieve schema and constraints for this table
-                table_ref = client.dataset(dataset_id).table(original_table_id)
-                table_obj = client.get_table(table_ref)
-                table_field_info = get_field_info(table_obj.schema)
+                project_info["datasets"].append(dataset_info)
 
-                dataset_constraints = constraints_data.get(dataset_id, {})
-                enriched_fields = []
-                for field in table_field_info:
-                    enriched_field = enrich_field_with_constraints(
-                        field, original_table_id, dataset_constraints
-                    )
-                    enriched_fields.append(enriched_field)
+        return project_info
 
-                dataset_info["tables"].append({
-                    "table_id": normalized_table_id,
-                    "fields": enriched_fields
-                })
+    except Exception as exc:
+        logger.error("Error processing BigQuery info: %s", str(exc))
+        raise
 
-            project_info["datasets"].append(dataset_info)
 
-        return jsonify(project_info), 200
+# Standard SQL type names whose legacy SchemaField.field_type differs
+_LEGACY_TYPE_NAMES = {
+    "INT64": "INTEGER",
+    "FLOAT64": "FLOAT",
+    "BOOL": "BOOLEAN",
+    "STRUCT": "RECORD",
+}
 
-    except Exception as exc:  # pylint: disable=broad-exception-caught
-        logger.error("Error processing BigQuery info: %s", str(exc))
-        error_response = jsonify({"error": f"An error occurred: {exc}"})
-        return error_response, 500
 
+@functools.lru_cache(maxsize=256)
+def _legacy_type_name(data_type: str) -> str:
+    """
+    Map a COLUMN_FIELD_PATHS data type in Standard SQL form (INT64,
+    ARRAY<INT64>, STRING(10), RANGE<DATE>) to the SchemaField.field_type
+    get_field_info reports (INTEGER, INTEGER, STRING, RANGE). An array
+    reports its element type, as a REPEATED field's field_type does, and
+    type parameters are dropped.
+    """
+    if data_type.startswith("ARRAY<"):
+        data_type = data_type[len("ARRAY<"):-1]
+    base = data_type.split("(", 1)[0].split("<", 1)[0].strip()
+    return _LEGACY_TYPE_NAMES.get(base, base)
 
-def get_constraints(client: bigquery.Client, dataset_id: str) -> dict:
+
+def get_columns(client: bigquery.Client, dataset_id: str, table_ids: list):
     """
-    Fetch primary key and foreign key constraints for a given dataset
-    from INFORMATION_SCHEMA.KEY_COLUMN_USAGE. Returns a dictionary with
-    primary keys and foreign keys.
+    Fetch the leaf fields of several tables of a dataset with one query
+    against INFORMATION_SCHEMA.COLUMN_FIELD_PATHS, which already flattens
+    nested RECORD fields into dot-delimited paths. STRUCT (RECORD) columns
+    themselves are skipped, mirroring get_field_info.
+
+    Data types are reported with the legacy names get_field_info uses (e.g.
+    INTEGER rather than INT64; see _legacy_type_name), so a response does not
+    mix vocabularies between datasets read here and through get_table.
 
     :param client: A BigQuery client (user-specific or default).
     :type client: bigquery.Client
-    :param dataset_id: The dataset ID to fetch constraints for.
+    :param dataset_id: The dataset containing the tables.
     :type dataset_id: str
-    :return: Dictionary with 'primary_keys' and 'foreign_keys'.
-    :rtype: dict
+    :param table_ids: The table names to fetch fields for.
+    :type table_ids: list
+    :return: Dict of table name -> list of field dicts (same shape as
+        get_field_info), or None if INFORMATION_SCHEMA could not be queried.
+        Tables the views return no fields for (e.g. views, or tables created
+        since) are left out, for the caller to read through get_table.
+    :rtype: dict or None
+    """
+    # COLUMN_FIELD_PATHS has no column position; joining COLUMNS orders the
+    # fields as the table schema does, like get_field_info
+    columns_query = f"""
+        SELECT
+            paths.table_name,
+            paths.field_path,
+            paths.data_type,
+            paths.description
+        FROM
+            `{client.project}.{dataset_id}.INFORMATION_SCHEMA.COLUMN_FIELD_PATHS` AS paths
+        JOIN
+            `{client.project}.{dataset_id}.INFORMATION_SCHEMA.COLUMNS` AS cols
+            ON cols.table_name = paths.table_name
+            AND cols.column_name = paths.column_name
+        WHERE
+            paths.table_name IN UNNEST(@table_ids)
+            AND NOT STARTS_WITH(paths.data_type, 'STRUCT<')
+            AND NOT STARTS_WITH(paths.data_type, 'ARRAY<STRUCT<')
+        ORDER BY
+            paths.table_name,
+            cols.ordinal_position,
+            paths.field_path
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ArrayQueryParameter("table_ids", "STRING", list(table_ids))
+        ]
+    )
+
+    try:
+        rows = client.query(columns_query, job_config=job_config).result()
+    except GoogleAPICallError as exc:
+        logger.warning(
+            "Falling back to per-table schema fetch for dataset %s: %s",
+            dataset_id, str(exc)
+        )
+        return None
+
+    columns = {}
+    for row in rows:
+        columns.setdefault(row.table_name, []).append({
+            "field_path": row.field_path,
+            "data_type": _legacy_type_name(row.data_type),
+            "description": row.description or None,
+            "collation_name": None,  # BigQuery does not support collation
+            "rounding_mode": None    # BigQuery does not support rounding
+        })
+
+    return columns
+
+
+# Classifies primary keys vs foreign keys based on constraint name, yielding
+# the matching constraints dict key
+_KEY_KIND_SQL = """
+            CASE
+                WHEN UPPER(CONSTRAINT_NAME) LIKE '%PK%' THEN 'primary_keys'
+                WHEN UPPER(CONSTRAINT_NAME) LIKE '%FK%' THEN 'foreign_keys'
+            END AS KEY_KIND"""
+
+# Keeps only the key columns _KEY_KIND_SQL can classify, so rows of other
+# constraints are dropped server-side
+_KEY_FILTER_SQL = "REGEXP_CONTAINS(UPPER(CONSTRAINT_NAME), 'PK|FK')"
+
+
+# Key columns of a table without constraints
+_NO_KEYS = frozenset()
+
+
+# Shared, read-only result for datasets without readable constraints
+_EMPTY_CONSTRAINTS = MappingProxyType({
+    "primary_keys": MappingProxyType({}),
+    "foreign_keys": MappingProxyType({}),
+})
+
+# Datasets per UNION ALL job, keeping the SQL text far below the query
+# length limit on projects with very many datasets
+CONSTRAINT_QUERY_BATCH = 500
+
+
+def _empty_constraints() -> dict:
+    """Constraint mapping for a dataset without (or with unreadable) keys."""
+    return {
+        "primary_keys": {},
+        "foreign_keys": {},
+    }
+
+
+# Columns of a KEY_COLUMN_USAGE query, in _classify_key_column's order
+_KEY_COLUMN_FIELDS = ("TABLE_NAME", "COLUMN_NAME", "CONSTRAINT_NAME", "KEY_KIND")
+
+
+def _result_columns(query_job, names):
+    """
+    Read the named columns of a finished query as Python lists, in one
+    columnar pass over an Arrow table instead of one bigquery.Row per row.
+    Key column results are small, so they are read over REST.
+    """
+    table = query_job.result().to_arrow(create_bqstorage_client=False)
+    return [table.column(name).to_pylist() for name in names]
+
+
+def _classify_key_column(
+    constraints: dict, table_name, column_name, constraint_name, key_kind, debug: bool
+) -> None:
+    """
+    Record one KEY_COLUMN_USAGE row under the key kind computed in SQL
+    (see _KEY_KIND_SQL); _KEY_FILTER_SQL leaves no unclassified rows.
+    """
+    if debug:
+        logger.debug(
+            "Key Found - Table: %s, Column: %s, Constraint: %s",
+            table_name, column_name, constraint_name
+        )
+    constraints[key_kind].setdefault(table_name, set()).add(column_name)
+
+
+def _count_keys(constraints: dict, kind: str) -> int:
+    """Number of key columns of one kind in a constraint mapping."""
+    return sum(len(cols) for cols in constraints[kind].values())
+
+
+# Constraint lookups, keyed with the principal and then the project first
+_project_constraints_cache = TTLCache(maxsize=32, ttl=600)
+_project_constraints_lock = threading.Lock()
+_constraints_cache = TTLCache(maxsize=256, ttl=600)
+_constraints_lock = threading.Lock()
+
+
+@cached(
+    _project_constraints_cache,
+    key=lambda client, dataset_ids: hashkey(
+        _credential_identity(client), client.project, tuple(dataset_ids)
+    ),
+    lock=_project_constraints_lock,
+)
+def _fetch_project_constraints(client: bigquery.Client, dataset_ids) -> dict:
+    """
+    Query KEY_COLUMN_USAGE of several datasets in a single job (one per
+    CONSTRAINT_QUERY_BATCH datasets) by joining the per-dataset views with
+    UNION ALL. Results are cached per
+    (principal, project, dataset ids) for ten minutes; errors propagate and
+    are not cached.
+
+    Dataset IDs may only contain letters, digits and underscores, so they
+    can be inlined both as identifiers and as string literals.
+    """
+    constraints_by_dataset = {
+        dataset_id: _empty_constraints() for dataset_id in dataset_ids
+    }
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    for start in range(0, len(dataset_ids), CONSTRAINT_QUERY_BATCH):
+        key_columns_query = "\nUNION ALL\n".join(
+            f"""
+            SELECT
+                '{dataset_id}' AS DATASET_ID,
+                TABLE_NAME,
+                COLUMN_NAME,
+                CONSTRAINT_NAME,{_KEY_KIND_SQL}
+            FROM
+                `{client.project}.{dataset_id}.INFORMATION_SCHEMA.KEY_COLUMN_USAGE`
+            WHERE
+                {_KEY_FILTER_SQL}
+            """
+            for dataset_id in dataset_ids[start:start + CONSTRAINT_QUERY_BATCH]
+        )
+
+        dataset_column, *key_columns = _result_columns(
+            client.query(key_columns_query), ("DATASET_ID",) + _KEY_COLUMN_FIELDS
+        )
+        for dataset_id, *values in zip(dataset_column, *key_columns):
+            _classify_key_column(constraints_by_dataset[dataset_id], *values, debug)
+
+    logger.info(
+        "project %s: %d PKs, %d FKs across %d datasets",
+        client.project,
+        sum(_count_keys(c, "primary_keys") for c in constraints_by_dataset.values()),
+        sum(_count_keys(c, "foreign_keys") for c in constraints_by_dataset.values()),
+        len(constraints_by_dataset)
+    )
+    return constraints_by_dataset
+
+
+def get_project_constraints(client: bigquery.Client, dataset_ids):
+    """
+    Fetch primary key and foreign key constraints for several datasets
+    with one INFORMATION_SCHEMA query instead of one per dataset.
+
+    A query over datasets in different locations is rejected by BigQuery;
+    in that case (or on any other API error) None is returned and the
+    caller is expected to fall back to get_constraints per dataset.
+
+    :param client: A BigQuery client (user-specific or default).
+    :type client: bigquery.Client
+    :param dataset_ids: The dataset IDs to fetch constraints for.
+    :type dataset_ids: list
+    :return: Mapping of dataset ID to the get_constraints dictionary, or
+        None if the combined query failed. It may be shared through the
+        cache and must not be mutated.
+    :rtype: dict | None
+    """
+    if not dataset_ids:
+        return {}
+
+    try:
+        return _fetch_project_constraints(client, dataset_ids)
+    except GoogleAPICallError as exc:
+        logger.warning(
+            "Project-wide constraint query failed, querying per dataset: %s", exc
+        )
+        return None
+
+
+@cached(
+    _constraints_cache,
+    key=lambda client, dataset_id: hashkey(
+        _credential_identity(client), client.project, dataset_id
+    ),
+    lock=_constraints_lock,
+)
+def _fetch_constraints(client: bigquery.Client, dataset_id: str) -> dict:
+    """
+    Query INFORMATION_SCHEMA.KEY_COLUMN_USAGE for a dataset and classify
+    its key columns. Results are cached per (principal, project, dataset)
+    for ten minutes; errors propagate and are not cached.
     """
     key_columns_query = f"""
         SELECT
             TABLE_NAME,
             COLUMN_NAME,
-            CONSTRAINT_NAME,
-            ORDINAL_POSITION
+            CONSTRAINT_NAME,{_KEY_KIND_SQL}
         FROM
             `{client.project}.{dataset_id}.INFORMATION_SCHEMA.KEY_COLUMN_USAGE`
         WHERE
-            CONSTRAINT_NAME IS NOT NULL
+            {_KEY_FILTER_SQL}
     """
 
-    try:
-        key_columns_results = client.query(key_columns_query).result()
-        constraints = {
-            "primary_keys": {},
-            "foreign_keys": {},
-        }
-
-        for row in key_columns_results:
-            table_name = row.TABLE_NAME
-            column_name = row.COLUMN_NAME
-            constraint_name = row.CONSTRAINT_NAME
-            ordinal_position = row.ORDINAL_POSITION
+    key_columns = _result_columns(client.query(key_columns_query), _KEY_COLUMN_FIELDS)
+    constraints = _empty_constraints()
 
-            logging.info(
-                "Key Found - Table: %s, Column: %s, Constraint: %s, Position: %s",
-                table_name, column_name, constraint_name, ordinal_position
-            )
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for values in zip(*key_columns):
+        _classify_key_column(constraints, *values, debug)
 
-            # Classify primary keys vs foreign keys based on constraint name
-            if "PK" in constraint_name.upper():
-                if table_name not in constraints["primary_keys"]:
-                    constraints["primary_keys"][table_name] = []
-                constraints["primary_keys"][table_name].append(column_name)
-                logging.info(
-                    "Primary Key Identified - Table: %s, Column: %s",
-                    table_name, column_name
-                )
-            elif "FK" in constraint_name.upper():
-                if table_name not in constraints["foreign_keys"]:
-                    constraints["foreign_keys"][table_name] = []
-                constraints["foreign_keys"][table_name].append(column_name)
-                logging.info(
-                    "Foreign Key Identified - Table: %s, Column: %s",
-                    table_name, column_name
-                )
-            else:
-                logging.warning(
-                    "Unclassified Key - Constraint: %s, Table: %s, Column: %s",
-                    constraint_name, table_name, column_name
-                )
+    logger.info(
+        "dataset %s: %d PKs, %d FKs",
+        dataset_id,
+        _count_keys(constraints, "primary_keys"),
+        _count_keys(constraints, "foreign_keys")
+    )
+    return constraints
 
-        logging.info("Constraints: %s", constraints)
 
-    except Exception as exc:  # pylint: disable=broad-exception-caught
-        logging.error("Error fetching constraints: %s", str(exc))
-        constraints = {
-            "primary_keys": {},
-            "foreign_keys": {},
-        }
+def get_constraints(client: bigquery.Client, dataset_id: str) -> dict:
+    """
+    Fetch primary key and foreign key constraints for a given dataset
+    from INFORMATION_SCHEMA.KEY_COLUMN_USAGE. Returns a dictionary with
+    primary keys and foreign keys.
 
-    return constraints
+    :param client: A BigQuery client (user-specific or default).
+    :type client: bigquery.Client
+    :param dataset_id: The dataset ID to fetch constraints for.
+    :type dataset_id: str
+    :return: Mapping with 'primary_keys' and 'foreign_keys', each mapping
+        a table name to the set of its key columns. It may be shared
+        through the cache and must not be mutated.
+    :rtype: Mapping
+    :raises: GoogleAPICallError for errors other than missing access to
+        (or a missing) KEY_COLUMN_USAGE view.
+    """
+    try:
+        return _fetch_constraints(client, dataset_id)
+    except (Forbidden, NotFound) as exc:
+        logger.warning("Constraints unavailable for dataset %s: %s", dataset_id, str(exc))
+        return _EMPTY_CONSTRAINTS
 
 
-def enrich_field_with_constraints(field: dict, table_id: str, constraints: dict) -> dict:
+def invalidate_bigquery_info(client: bigquery.Client) -> int:
     """
-    Enrich a field dictionary with primary key and foreign key information.
+    Drop the cached metadata (project info and constraints) the client's
+    principal holds for the client's project, so its next get_bigquery_info
+    call fetches everything again. Other principals' entries are kept.
 
-    :param field: The field dictionary containing schema information.
-    :type field: dict
-    :param table_id: The table name used to lookup constraints.
-    :type table_id: str
-    :param constraints: Dictionary with primary and foreign keys for the dataset.
-    :type constraints: dict
-    :return: The updated field dictionary with constraint info.
-    :rtype: dict
+    :param client: The BigQuery client whose entries should be evicted.
+    :type client: bigquery.Client
+    :return: Number of cache entries removed.
+    :rtype: int
+    """
+    prefix = (_credential_identity(client), client.project)
+    removed = 0
+    for cache, lock in (
+        (_bigquery_info_cache, _bigquery_info_lock),
+        (_project_constraints_cache, _project_constraints_lock),
+        (_constraints_cache, _constraints_lock),
+    ):
+        with lock:
+            for key in [key for key in cache if key[:2] == prefix]:
+                del cache[key]
+                removed += 1
+    return removed
+
+
+def enrich_fields(fields, pk_set: set, fk_set: set) -> list:
     """
-    column_name = field.get("field_path")
-    is_pk = False
-    is_fk = False
-    referenced_table = None
-    referenced_column = None
+    Enrich the field dictionaries of one table with primary key and foreign
+    key information. Most tables declare no constraints at all, in which
+    case the flags are set without looking up each field path.
+
+    :param fields: The table's field dictionaries containing schema information.
+    :type fields: Iterable[dict]
+    :param pk_set: Primary key column names of the table.
+    :type pk_set: set
+    :param fk_set: Foreign key column names of the table.
+    :type fk_set: set
+    :return: The updated field dictionaries with constraint info.
+    :rtype: list
+    """
+    fields = list(fields)
 
-    # Check if this column is a primary key
-    if column_name in constraints.get("primary_keys", {}).get(table_id, []):
-        is_pk = True
+    if not pk_set and not fk_set:
+        for field in fields:
+            field["is_primary_key"] = False
+            field["is_foreign_key"] = False
+            field["referenced_table"] = None
+            field["referenced_column"] = None
+        return fields
 
-    # Check if this column is a foreign key
-    if column_name in constraints.get("foreign_keys", {}).get(table_id, []):
-        is_fk = True
+    for field in fields:
+        column_name = field.get("field_path")
+        field["is_primary_key"] = column_name in pk_set
+        field["is_foreign_key"] = column_name in fk_set
         # Optionally set referenced_table/referenced_column if desired
+        field["referenced_table"] = None
+        field["referenced_column"] = None
 
-    field["is_primary_key"] = is_pk
-    field["is_foreign_key"] = is_fk
-    field["referenced_table"] = referenced_table
-    field["referenced_column"] = referenced_column
+    return fields
 
-    return field
 
-
-def get_field_info(fields, parent_field_name="") -> list:
+def get_field_info(fields, parent_field_name=""):
     """
-    Recursively extract field information from a BigQuery table schema,
-    handling nested RECORD (STRUCT) types.
+    Extract field information from a BigQuery table schema, handling nested
+    RECORD (STRUCT) types.
+
+    Nested records are walked with an explicit stack of field iterators
+    rather than recursion, and fields are yielded one by one in schema order
+    so callers can consume them without an intermediate list per nesting
+    level.
 
     :param fields: The schema fields to process.
     :type fields: Sequence[bigquery.SchemaField]
     :param parent_field_name: The dot-delimited parent field name if nested.
     :type parent_field_name: str
-    :return: A list of dictionaries containing field metadata.
-    :rtype: list
+    :return: Dictionaries containing field metadata.
+    :rtype: Iterator[dict]
     """
-    field_info_list = []
+    stack = [(iter(fields), parent_field_name)]
 
-    for field in fields:
-        full_field_name = (
-            f"{parent_field_name}.{field.name}" if parent_field_name else field.name
-        )
+    while stack:
+        field_iter, parent = stack[-1]
+        field = next(field_iter, None)
+        if field is None:
+            stack.pop()
+            continue
+
+        full_field_name = parent + "." + field.name if parent else field.name
 
         if field.field_type == "RECORD":
-            nested_field_info = get_field_info(field.fields, full_field_name)
-            field_info_list.extend(nested_field_info)
+            stack.append((iter(field.fields), full_field_name))
         else:
-            field_info_list.append({
+            yield {
                 "field_path": full_field_name,
                 "data_type": field.field_type,
                 "description": field.description or None,
                 "collation_name": None,  # BigQuery does not support collation
                 "rounding_mode": None    # BigQuery does not support rounding
-            })
+            }
+
 
-    return field_info_list
+# Pulls the values a flat schema row needs out of an enriched field dict in
+# one C-level call (fields built by get_bigquery_info always carry all keys)
+_flat_field_values = operator.itemgetter(
+    "field_path", "data_type", "description", "is_primary_key", "is_foreign_key"
+)
 
 
-def flatten_bq_schema(project_info: dict) -> list:
+def iter_flat_bq_schema(project_info: dict):
     """
     Convert a nested 'project_info' dict (containing datasets and tables)
-    into a flat list of schema objects.
+    into a flat sequence of schema objects, yielded one at a time so the
+    caller can stream them out without building the whole list.
 
-    Each object in the returned list has this structure:
+    Each yielded object has this structure:
     {
       "table_catalog": str,
       "table_schema": str,
@@ -371,10 +941,9 @@ def flatten_bq_schema(project_info: dict) -> list:
 
     :param project_info: The project info dictionary with datasets, tables, etc.
     :type project_info: dict
-    :return: A flattened list of schema objects.
-    :rtype: list
+    :return: A generator of flattened schema objects.
+    :rtype: Iterator[dict]
     """
-    flattened = []
     top_level_project = project_info.get("project_id", "unknown_project")
 
     for dataset in project_info.get("datasets", []):
@@ -384,25 +953,25 @@ def flatten_bq_schema(project_info: dict) -> list:
         for table in dataset.get("tables", []):
             tbl_id = table.get("table_id", "")
 
-            for field in table.get("fields", []):
-                col_name = field.get("field_path", "")
-                field_path = field.get("field_path", "")
-
-                flattened.append({
+            for field_path, data_type, description, is_pk, is_fk in map(
+                _flat_field_values, table.get("fields", [])
+            ):
+                yield {
                     "table_catalog": ds_project_id,
                     "table_schema": ds_id,
                     "table_name": tbl_id,
-                    "column_name": col_name,
+                    "column_name": field_path,
                     "field_path": field_path,
-                    "data_type": field.get("data_type", ""),
-                    "description": field.get("description"),
+                    "data_type": data_type,
+                    "description": description,
                     "collation_name": "NULL",  # BigQuery doesn't support collation
                     "rounding_mode": None,
-                    "primary_key": field.get("is_primary_key", False),
-                    "foreign_key": field.get("is_foreign_key", False),
-                })
+                    "primary_key": is_pk,
+                    "foreign_key": is_fk,
+                }
+
 
-    return flattened
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
 
 
 def human_readable_size(num_bytes: float) -> str:
@@ -410,11 +979,11 @@ def human_readable_size(num_bytes: float) -> str:
     Converts bytes into a human-readable string with B, KB, MB, GB, etc.
     Example: 1234 bytes -> '1.21 KB'
     """
-    for unit in ["B", "KB", "MB", "GB", "TB", "PB"]:
-        if num_bytes < 1024.0:
-            return f"{num_bytes:0.2f} {unit}"
-        num_bytes /= 1024.0
-    return f"{num_bytes:0.2f} PB"  # fallback if huge
+    if num_bytes < 1024:
+        return f"{num_bytes:0.2f} B"
+    # Each unit is 2**10 of the previous one, so the bit length picks it
+    idx = min((int(num_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{num_bytes / (1 << (idx * 10)):0.2f} {_SIZE_UNITS[idx]}"
 
 
 def dry_run_query(client: bigquery.Client, sql_query: str) -> dict:
@@ -1,8 +1,13 @@
 """service to use llm (openai) to translate bigquery queries to questions"""
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import openai
 from openai import OpenAI
 
+from ..utils.logging_config import logger
+from ..utils.question_cache import get_questions, set_question
+
 # Set your OpenAI API key
 openai.api_key = os.getenv("OPENAI_API_KEY")
 client = OpenAI(
@@ -10,27 +15,34 @@ client = OpenAI(
 )
 
 
-def generate_natural_language_question(query):
-    """Generates a natural language question using gpt-3.5-turbo."""
+# The system prompt never changes, so the message is built once and reused
+_NL_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are a helpful assistant that translates BigQuery SQL queries into natural language questions.\n\n"
+        "Here is an example of the style we want:\n\n"
+        "EXAMPLE SQL:\n"
+        "  SELECT name\n"
+        "  FROM employees\n"
+        "  WHERE department = 'Sales';\n\n"
+        "EXAMPLE NATURAL LANGUAGE QUESTION:\n"
+        "  'Which employees work in the Sales department?'\n\n"
+        "Notice that the question focuses on what a user might *ask* in plain English.\n\n"
+        "Now, please produce a similar natural language question for the following SQL query:"
+    )
+}
+
+
+def _translate_query(query):
+    """
+    Ask OpenAI for the question matching a query, without consulting the
+    cache, and cache the answer if the request succeeded.
+    """
     try:
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant that translates BigQuery SQL queries into natural language questions.\n\n"
-                        "Here is an example of the style we want:\n\n"
-                        "EXAMPLE SQL:\n"
-                        "  SELECT name\n"
-                        "  FROM employees\n"
-                        "  WHERE department = 'Sales';\n\n"
-                        "EXAMPLE NATURAL LANGUAGE QUESTION:\n"
-                        "  'Which employees work in the Sales department?'\n\n"
-                        "Notice that the question focuses on what a user might *ask* in plain English.\n\n"
-                        "Now, please produce a similar natural language question for the following SQL query:"
-                    )
-                },
+                _NL_SYSTEM_MSG,
                 {
                     "role": "user",
                     "content": f"```sql\n{query}\n```"
@@ -42,18 +54,44 @@ def generate_natural_language_question(query):
             temperature=0.7,
         )
         question = response.choices[0].message.content.strip()
-        return question
     except openai.APIConnectionError as e:
-        print("The server could not be reached")
-        print(e.__cause__)
+        logger.warning("The OpenAI server could not be reached: %s", e.__cause__)
         return f"Error generating question for: {query}"
     except openai.RateLimitError as e:
-        print("A 429 status code was received; we should back off a bit. %s", {e})
+        logger.warning("OpenAI rate limit reached (429); we should back off a bit: %s", e)
         return f"Error generating question for: {query}"
     except openai.APIStatusError as e:
-        print("Another non-200-range status code was received")
-        print(e.status_code)
-        print(e.response)
+        logger.warning(
+            "OpenAI returned non-200-range status %s: %s", e.status_code, e.response
+        )
         return f"Error generating question for: {query}"
 
+    # Only successful translations are cached
+    set_question(query, question)
+    return question
+
 
+def generate_natural_language_questions(queries, max_workers):
+    """
+    Translate a batch of queries to questions, yielding them in input order
+    as soon as each one (and every one before it) is ready. Cached questions
+    are read in one lookup; only the remaining distinct queries are sent to
+    OpenAI, with up to max_workers (the OPENAI_QUESTION_WORKERS setting)
+    concurrent requests.
+    """
+    queries = list(queries)
+    if not queries:
+        return
+    cached = get_questions(queries)
+    missing = [query for query in dict.fromkeys(queries) if query not in cached]
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing))))
+    try:
+        pending = {query: pool.submit(_translate_query, query) for query in missing}
+        for query in queries:
+            question = cached.get(query)
+            yield question if question is not None else pending[query].result()
+    finally:
+        # A client that disconnects closes the generator; drop the requests
+        # that have not started yet
+        pool.shutdown(cancel_futures=True)
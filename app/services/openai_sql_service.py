@@ -1,16 +1,22 @@
 # services/openai_sql_service.py
 
-import os
 import openai
-from openai import OpenAI
 
-# Set your OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
+from ..utils.logging_config import logger
+# Share the client (and its connection pool) with the question generator
+from .openai_service import client
 
-# Create a client instance
-client = OpenAI(
-    api_key=os.environ.get("OPENAI_API_KEY"),  # same as openai.api_key, but explicit
-)
+# System instructions: only output valid BigQuery SQL, no extra text
+_SQL_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are a helpful AI that generates or refines SQL queries.\n"
+        "Only output valid SQL, with no extra commentary or explanation.\n"
+        "Use BigQuery dialect by default.\n"
+        "If the user provides existing SQL, refine or modify it.\n"
+        "If no existing SQL is provided, create a new valid SQL statement.\n"
+    )
+}
 
 def generate_sql_from_question(user_question: str, existing_sql: str = "") -> str:
     """
@@ -22,21 +28,9 @@ def generate_sql_from_question(user_question: str, existing_sql: str = "") -> st
     :return: A string containing the generated/refined SQL (or an error message).
     """
     try:
-        # System instructions: only output valid BigQuery SQL, no extra text
-        system_prompt = (
-            "You are a helpful AI that generates or refines SQL queries.\n"
-            "Only output valid SQL, with no extra commentary or explanation.\n"
-            "Use BigQuery dialect by default.\n"
-            "If the user provides existing SQL, refine or modify it.\n"
-            "If no existing SQL is provided, create a new valid SQL statement.\n"
-        )
-
         # We'll pass both the existing SQL and the user question in the conversation
         messages = [
-            {
-                "role": "system",
-                "content": system_prompt
-            },
+            _SQL_SYSTEM_MSG,
             {
                 "role": "user",
                 "content": (
@@ -60,14 +54,14 @@ def generate_sql_from_question(user_question: str, existing_sql: str = "") -> st
         return new_sql
 
     except openai.APIConnectionError as e:
-        print("The server could not be reached:", e.__cause__)
+        logger.warning("The OpenAI server could not be reached: %s", e.__cause__)
         return "ERROR: Connection to OpenAI failed."
     except openai.RateLimitError as e:
-        print("A 429 status code was received; we should back off a bit.", e)
+        logger.warning("OpenAI rate limit reached (429); we should back off a bit: %s", e)
         return "ERROR: Rate limit reached."
     except openai.APIStatusError as e:
-        print("Another non-200-range status code was received", e.status_code)
+        logger.warning("OpenAI returned non-200-range status %s", e.status_code)
         return f"ERROR: OpenAI returned status {e.status_code}"
     except Exception as e:
-        print("Unknown error in generate_sql_from_question:", e)
+        logger.exception("Unknown error in generate_sql_from_question")
         return f"ERROR: {str(e)}"
@@ -1,66 +1,201 @@
 """service for using natural language libraries to provide field evaluations"""
-import logging
-from collections import defaultdict
-from itertools import combinations
+import os
+import platform
+import threading
 import re
+from itertools import combinations, compress
+import numpy as np
 import spacy
-from sentence_transformers import SentenceTransformer, util
+import torch
+from cachetools import LRUCache
+from spacy.attrs import IS_PUNCT, IS_SPACE, LIKE_NUM, POS
+from spacy.parts_of_speech import ADJ, NOUN, PROPN
+from sentence_transformers import SentenceTransformer
+from ..utils.logging_config import logger
+
+
+# spaCy pipeline used for the field name checks. en_core_web_md carries the
+# word vectors for the doc-similarity checks; a pipeline without vectors
+# (e.g. en_core_web_sm, much smaller and faster to load) judges names on
+# part-of-speech alone.
+SPACY_MODEL = os.getenv("SCORING_SPACY_MODEL", "en_core_web_md")
+
+# Models loaded on first use. Each is published under its lock, so
+# concurrent first requests load it once instead of once per thread.
+_NOT_LOADED = object()
+_nlp = _NOT_LOADED
+_nlp_lock = threading.Lock()
+_reference_units_value = _NOT_LOADED
+_reference_units_lock = threading.Lock()
+_sentence_model = _NOT_LOADED
+_sentence_model_lock = threading.Lock()
+
+
+def get_nlp():
+    """
+    Load the spaCy pipeline on first use. Only the tagger (with the
+    attribute_ruler that maps tags to pos_) and the vectors are used, so the
+    parser, NER and lemmatizer are not loaded.
+    """
+    global _nlp  # pylint: disable=global-statement
+    if _nlp is _NOT_LOADED:
+        with _nlp_lock:
+            if _nlp is _NOT_LOADED:
+                _nlp = spacy.load(SPACY_MODEL, exclude=["parser", "ner", "lemmatizer"])
+    return _nlp
+
+
+# _doc_features result for an informative name when there are no vectors
+_POS_ONLY = ()
+
+# Token attributes read by _doc_features: the POS id, then the flags that
+# rule a token out (punctuation, numbers, whitespace)
+_TOKEN_ATTRS = [POS, IS_PUNCT, LIKE_NUM, IS_SPACE]
+_INFORMATIVE_POS_IDS = np.array([NOUN, PROPN, ADJ], dtype=np.uint64)
 
 
-# Configure Logging
+def _reference_units():
+    """
+    Unit-length vectors of the reference docs for the similarity checks, so
+    a similarity is one dot product divided by the field name's own vector
+    norm. None if the pipeline has no word vectors.
+    """
+    global _reference_units_value  # pylint: disable=global-statement
+    if _reference_units_value is _NOT_LOADED:
+        with _reference_units_lock:
+            if _reference_units_value is _NOT_LOADED:
+                _reference_units_value = _compute_reference_units()
+    return _reference_units_value
+
+
+def _compute_reference_units():
+    """Build the _reference_units result from the spaCy pipeline."""
+    nlp = get_nlp()
+    if nlp.vocab.vectors.n_keys == 0:
+        return None
+    doc_meaningful_ref = nlp("meaningful field name")
+    doc_placeholder_ref = nlp("placeholder unknown generic dummy test")
+    return (
+        doc_meaningful_ref.vector / (doc_meaningful_ref.vector_norm or 1.0),
+        doc_placeholder_ref.vector / (doc_placeholder_ref.vector_norm or 1.0),
+    )
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-ch = logging.StreamHandler()
-ch.setLevel(logging.DEBUG)
-logger.addHandler(ch)
 
+# Names processed per nlp.pipe batch
+SPACY_BATCH_SIZE = 256
 
-# Load spaCy model with word vectors
-nlp = spacy.load("en_core_web_md")
+# Threshold-independent spaCy features per processed field name (see
+# _doc_features). Column names repeat across tables, schemas and requests.
+_name_feature_cache = LRUCache(maxsize=100_000)
+_name_feature_cache_lock = threading.Lock()
+_MISSING = object()
 
-# Reference docs for optional similarity checks in spaCy
-doc_meaningful_ref = nlp("meaningful field name")
-doc_placeholder_ref = nlp("placeholder unknown generic dummy test")
 
+# Processed names that are generic placeholders (col1, field 2, tmp, foo,
+# unknown, ...) are rejected without running spaCy
+_PLACEHOLDER_NAME_RE = re.compile(
+    r"(col|column|field|tmp|temp|test|val|foo|bar|x|y|z|na|n ?a|\?|unknown) ?\d*",
+    re.IGNORECASE
+)
 
-def is_field_name_meaningful_spacy_advanced(
-    field_name: str,
-    doc_similarity_meaningful_min: float = 0.05,
-    doc_similarity_placeholder_max: float = 0.80
-) -> bool:
+
+# Any letter; a name without one (e.g. "2024 01", "#") cannot be meaningful
+_LETTER_RE = re.compile(r'[^\W\d_]')
+
+# Runs of dots and underscores separate the words of a field name
+_NAME_SEPARATOR_RE = re.compile(r'[._]+')
+
+
+def _process_field_name(field_name: str) -> str:
     """
-    Check if the field name is likely user-friendly (spaCy-based).
+    Replace underscores and dots with spaces to handle nested fields.
+    For example, "device.web_info.browser" -> "device web info browser"
     """
-    # Replace underscores and dots with spaces to handle nested fields.
-    # For example, "device.web_info.browser" -> "device web info browser"
-    field_name_proc = field_name.strip()
-    field_name_proc = re.sub(r'[._]+', ' ', field_name_proc)
+    return _NAME_SEPARATOR_RE.sub(' ', field_name.strip())
 
-    # Basic length check
-    if len(field_name_proc) < 4:
-        return False
 
-    doc = nlp(field_name_proc)
+def _doc_features(doc):
+    """
+    spaCy analysis of a processed field name, independent of any threshold.
 
-    # Filter out punctuation, numeric tokens, or empty strings
-    valid_tokens = [
-        token for token in doc
-        if not token.is_punct
-        and not token.like_num
-        and token.text.strip()
-    ]
-    if not valid_tokens:
-        return False
+    Returns None if the name has no informative (NOUN, PROPN or ADJ) token,
+    else its (meaningful, placeholder) similarities to the reference docs,
+    or _POS_ONLY if the pipeline has no word vectors to compare.
+    """
+    # Filter out punctuation, numeric tokens, or empty strings, then check
+    # for at least one NOUN, PROPN, or ADJ among the remaining tokens
+    token_attrs = doc.to_array(_TOKEN_ATTRS)
+    valid = ~token_attrs[:, 1:].any(axis=1)
+    if not np.isin(token_attrs[valid, 0], _INFORMATIVE_POS_IDS).any():
+        return None
+
+    reference_units = _reference_units()
+    if reference_units is None:
+        return _POS_ONLY
+    meaningful_ref_unit, placeholder_ref_unit = reference_units
+
+    # Same as doc.similarity(ref): cosine, or 0.0 for a doc without vectors
+    vector_norm = doc.vector_norm
+    if not vector_norm:
+        return 0.0, 0.0
+    vector = doc.vector
+    return (
+        float(vector @ meaningful_ref_unit) / vector_norm,
+        float(vector @ placeholder_ref_unit) / vector_norm,
+    )
 
-    # Check for at least one NOUN, PROPN, or ADJ
-    has_informative_pos = any(token.pos_ in ("NOUN", "PROPN", "ADJ") for token in valid_tokens)
-    if not has_informative_pos:
-        return False
 
-    # doc-similarity checks
-    doc_similarity_meaningful = doc.similarity(doc_meaningful_ref)
-    doc_similarity_placeholder = doc.similarity(doc_placeholder_ref)
+def _name_features(names_proc) -> dict:
+    """
+    Map each processed field name to its _doc_features, running the names
+    that are not cached yet through spaCy as one nlp.pipe batch.
+    """
+    features = {}
+    with _name_feature_cache_lock:
+        for name in names_proc:
+            cached = _name_feature_cache.get(name, _MISSING)
+            if cached is not _MISSING:
+                features[name] = cached
+
+    missing = [name for name in dict.fromkeys(names_proc) if name not in features]
+    if missing:
+        # Always in-process: nlp.pipe(n_process > 1) forks, which is unsafe
+        # from a threaded request handler once torch has started its threads
+        docs = get_nlp().pipe(missing, batch_size=SPACY_BATCH_SIZE)
+        computed = {name: _doc_features(doc) for name, doc in zip(missing, docs)}
+        with _name_feature_cache_lock:
+            _name_feature_cache.update(computed)
+        features.update(computed)
+
+    return features
+
+
+def _needs_spacy_check(field_name_proc: str) -> bool:
+    """
+    True unless the processed name fails on length, has no letters or is an
+    obvious placeholder, none of which needs spaCy to decide.
+    """
+    return (
+        len(field_name_proc) >= 4
+        and _LETTER_RE.search(field_name_proc) is not None
+        and not _PLACEHOLDER_NAME_RE.fullmatch(field_name_proc)
+    )
+
+
+def _passes_spacy_checks(
+    features,
+    doc_similarity_meaningful_min: float,
+    doc_similarity_placeholder_max: float
+) -> bool:
+    """
+    Apply the POS and doc-similarity checks to the _name_features result of
+    a processed name that passed _needs_spacy_check.
+    """
+    if features is None:
+        return False
+    if features is _POS_ONLY:
+        return True
+    doc_similarity_meaningful, doc_similarity_placeholder = features
 
     # If doc similarity to "meaningful field name" is too low, fail
     if doc_similarity_meaningful < doc_similarity_meaningful_min:
@@ -72,8 +207,194 @@ def is_field_name_meaningful_spacy_advanced(
 
     return True
 
-# Initialize local SentenceTransformer model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+
+# Sentence embedding backend: "torch" (default) or "onnx". The ONNX backend
+# runs the int8-quantized export of the model published for this CPU and
+# needs the sentence-transformers[onnx] extra installed (see requirements.txt).
+SENTENCE_MODEL_BACKEND = os.getenv("SCORING_SENTENCE_BACKEND", "torch")
+
+
+def _cgroup_cpu_limit():
+    """
+    CPUs allowed by the container's CFS quota (cgroup v2 cpu.max, else
+    cgroup v1 cfs_quota_us / cfs_period_us), rounded up; None if unlimited.
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", encoding="utf-8") as f:
+                quota = f.read().strip()
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", encoding="utf-8") as f:
+                period = f.read().strip()
+        except OSError:
+            return None
+    if quota in ("max", "-1"):
+        return None
+    return max(1, -(-int(quota) // int(period)))
+
+
+def _inference_threads() -> int:
+    """
+    Threads for one embedding forward pass: SCORING_TORCH_THREADS if set,
+    else the CPUs this process may run on (its affinity mask), capped by the
+    container CPU quota. Set it to cores / workers when several Gunicorn
+    workers share the host.
+    """
+    configured = os.getenv("SCORING_TORCH_THREADS")
+    if configured:
+        return max(1, int(configured))
+    try:
+        threads = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # No affinity API (macOS, Windows)
+        threads = os.cpu_count() or 1
+    cgroup_limit = _cgroup_cpu_limit()
+    return min(threads, cgroup_limit) if cgroup_limit else threads
+
+
+def _configure_torch_threads(threads: int) -> None:
+    """
+    Bound torch's intra-op pool and drop its inter-op pool, so concurrent
+    requests do not oversubscribe the CPU.
+    """
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before the first parallel torch operation
+        logger.debug("torch inter-op thread count already fixed")
+
+
+def _onnx_model_file() -> str:
+    """Pick the quantized ONNX export of all-MiniLM-L6-v2 suited to this CPU."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            cpu_flags = f.read()
+    except OSError:
+        cpu_flags = ""
+    if "avx512_vnni" in cpu_flags:
+        return "onnx/model_qint8_avx512_vnni.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+def get_sentence_model() -> SentenceTransformer:
+    """
+    Load the local SentenceTransformer model with the configured backend on
+    first use, sizing the inference thread pool at the same time.
+    """
+    global _sentence_model  # pylint: disable=global-statement
+    if _sentence_model is _NOT_LOADED:
+        with _sentence_model_lock:
+            if _sentence_model is _NOT_LOADED:
+                _sentence_model = _load_sentence_model()
+    return _sentence_model
+
+
+def _load_sentence_model() -> SentenceTransformer:
+    """Build the get_sentence_model result for SENTENCE_MODEL_BACKEND."""
+    threads = _inference_threads()
+    _configure_torch_threads(threads)
+    if SENTENCE_MODEL_BACKEND == "onnx":
+        # onnxruntime is an optional dependency (see requirements.txt), so it
+        # is only imported when the ONNX backend is selected
+        try:
+            import onnxruntime  # pylint: disable=import-outside-toplevel
+        except ImportError as exc:
+            raise ImportError(
+                "SCORING_SENTENCE_BACKEND=onnx requires the optional ONNX runtime; "
+                "install sentence-transformers[onnx]"
+            ) from exc
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        session_options.inter_op_num_threads = 1
+        return SentenceTransformer(
+            'all-MiniLM-L6-v2',
+            backend="onnx",
+            model_kwargs={
+                "file_name": _onnx_model_file(),
+                "session_options": session_options,
+            }
+        )
+    return SentenceTransformer('all-MiniLM-L6-v2')
+
+
+# Normalized embedding per field name. Common column names (id, created_at,
+# email, ...) are shared by most schemas that get scored.
+_embedding_cache = LRUCache(maxsize=50_000)
+_embedding_cache_lock = threading.Lock()
+
+
+def _embed_names(names) -> np.ndarray:
+    """
+    Return the L2-normalized embeddings of distinct field names as the rows
+    of one array, encoding only the names that are not cached yet.
+    """
+    with _embedding_cache_lock:
+        cached = {name: _embedding_cache.get(name) for name in names}
+
+    missing = [name for name, embedding in cached.items() if embedding is None]
+    if missing:
+        encoded = get_sentence_model().encode(
+            missing,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        computed = dict(zip(missing, encoded))
+        with _embedding_cache_lock:
+            _embedding_cache.update(computed)
+        cached.update(computed)
+
+    return np.stack([cached[name] for name in names])
+
+
+def _similar_name_pairs(field_names, table_field_indices, similarity_threshold):
+    """
+    Yield the positions (i, j) of same-table fields whose names have a
+    cosine similarity of at least similarity_threshold.
+    """
+    # Embed each distinct field name once. The embeddings are L2-normalized,
+    # so a dot product is their cosine similarity.
+    unique_names = list(dict.fromkeys(field_names))
+    embeddings = _embed_names(unique_names)
+    name_to_row = {name: row for row, name in enumerate(unique_names)}
+    field_rows = np.fromiter(
+        (name_to_row[name] for name in field_names), dtype=np.intp, count=len(field_names)
+    )
+
+    # One similarity matrix per table, of which the upper triangle holds
+    # each pair once
+    for indices in table_field_indices:
+        if len(indices) < 2:
+            continue
+        indices = np.asarray(indices)
+        table_embeddings = embeddings[field_rows[indices]]
+        sims = table_embeddings @ table_embeddings.T
+        upper_i, upper_j = np.triu_indices(len(indices), k=1)
+
+        for hit in np.flatnonzero(sims[upper_i, upper_j] >= similarity_threshold):
+            yield indices[upper_i[hit]], indices[upper_j[hit]]
+
+
+def _duplicate_name_pairs(field_names, table_field_indices):
+    """Yield the positions (i, j) of same-table fields with identical names."""
+    for indices in table_field_indices:
+        positions_by_name = {}
+        for idx in indices:
+            positions_by_name.setdefault(field_names[idx], []).append(idx)
+        for positions in positions_by_name.values():
+            yield from combinations(positions, 2)
+
+
+def _flagged_names(field_names, mask) -> list:
+    """Distinct names of the flagged fields, in schema order."""
+    return list(dict.fromkeys(compress(field_names, mask)))
 
 
 def score_gen_ai(
@@ -116,17 +437,43 @@ def score_gen_ai(
         }
 
     required_keys = {'table_name', 'column_name'}
-    for entry in schema:
+    total_fields = len(schema)
+
+    # One pass over the schema into per-field columns (indexed by the field's
+    # position), so every metric below reads arrays instead of re-walking
+    # the list of dicts. Tables are numbered in order of first appearance.
+    field_names = []
+    field_descriptions = []
+    field_table_ids = []
+    field_has_type = []
+    field_is_pk = []
+    field_is_fk = []
+    table_ids = {}
+    table_field_indices = []
+
+    for idx, entry in enumerate(schema):
         if not required_keys.issubset(entry.keys()):
-            logger.error("Schema entry missing required keys:%s", {entry})
+            logger.error("Schema entry missing required keys:%s", entry)
             return {
                 'error': 'Invalid schema entry',
                 'message': f'Each schema entry must contain at least {required_keys}'
             }
 
-    total_fields = len(schema)
-    total_tables = set(entry['table_name'] for entry in schema)
-    num_tables = len(total_tables)
+        table_id = table_ids.get(entry['table_name'])
+        if table_id is None:
+            table_id = table_ids[entry['table_name']] = len(table_ids)
+            table_field_indices.append([])
+        table_field_indices[table_id].append(idx)
+
+        desc_val = entry.get('description')
+        field_names.append(entry['column_name'])
+        field_descriptions.append(desc_val.strip() if desc_val and isinstance(desc_val, str) else '')
+        field_table_ids.append(table_id)
+        field_has_type.append(bool(entry.get('data_type')))
+        field_is_pk.append(bool(entry.get('primary_key')))
+        field_is_fk.append(bool(entry.get('foreign_key')))
+
+    num_tables = len(table_ids)
 
     if total_fields == 0:
         logger.error("No fields found in schema, cannot compute scores.")
@@ -142,68 +489,58 @@ def score_gen_ai(
     field_types_score = 0.0
     keys_presence_score = 0.0
 
-    # Sets to track penalized fields
-    non_meaningful_fields = set()
-    non_meaningful_no_description = set()
-    similarity_penalized_fields = set()
+    # Penalized fields, flagged by position
+    non_meaningful_mask = np.zeros(total_fields, dtype=bool)
+    non_meaningful_no_description_mask = np.zeros(total_fields, dtype=bool)
+    similarity_penalized_mask = np.zeros(total_fields, dtype=bool)
 
     # For numeric scoring: how many fields are "meaningful or described"
     fields_meaningful_or_described = 0
 
-    # 1) Evaluate field names for meaningfulness
-    for entry in schema:
-        field_name = entry['column_name']
-        desc_val = entry.get('description')
-        desc = desc_val.strip() if desc_val and isinstance(desc_val, str) else ''
-
-        # Use adjustable spaCy check
-        if is_field_name_meaningful_spacy_advanced(
-            field_name,
-            doc_similarity_meaningful_min=doc_similarity_meaningful_min,
-            doc_similarity_placeholder_max=doc_similarity_placeholder_max
+    # 1) Evaluate field names for meaningfulness. Names that pass the cheap
+    # length and placeholder checks go through spaCy together, as one batch.
+    processed_names = [_process_field_name(name) for name in field_names]
+    needs_spacy = [_needs_spacy_check(name) for name in processed_names]
+    name_features = _name_features(list(compress(processed_names, needs_spacy)))
+
+    for idx, (field_name_proc, checked, desc) in enumerate(
+        zip(processed_names, needs_spacy, field_descriptions)
+    ):
+        # Use adjustable spaCy check on the names the cheap checks let through
+        if checked and _passes_spacy_checks(
+            name_features[field_name_proc],
+            doc_similarity_meaningful_min,
+            doc_similarity_placeholder_max
         ):
             fields_meaningful_or_described += 1
         else:
-            non_meaningful_fields.add(field_name)
+            non_meaningful_mask[idx] = True
             if desc:
                 # If there's a description, we don't penalize in numeric score
                 fields_meaningful_or_described += 1
             else:
                 # No description => numeric penalty
-                non_meaningful_no_description.add(field_name)
+                non_meaningful_no_description_mask[idx] = True
 
     # (a) Field Names Score
     field_names_score = (fields_meaningful_or_described / total_fields) * weights['field_names']
 
     # 2) Field Descriptions Metric
-    fields_with_descriptions = sum(
-        1 for entry in schema
-        if entry.get('description')
-        and isinstance(entry.get('description'), str)
-        and entry['description'].strip()
-    )
+    fields_with_descriptions = sum(map(bool, field_descriptions))
     field_descriptions_score = (fields_with_descriptions / total_fields) * weights['field_descriptions']
 
 
     # 3) Field Types Metric
-    fields_with_types = sum(1 for entry in schema if entry.get('data_type'))
+    fields_with_types = int(np.count_nonzero(field_has_type))
     field_types_score = (fields_with_types / total_fields) * weights['field_types']
 
     # 4) Keys Presence Metric
     if num_tables > 0:
-        tables_dict = defaultdict(list)
-        for entry in schema:
-            tables_dict[entry['table_name']].append(entry)
-
-        tables_with_primary_key = 0
-        tables_with_foreign_key = 0
-        for table_fields in tables_dict.values():
-            has_primary_key = any(field.get('primary_key') for field in table_fields)
-            has_foreign_key = any(field.get('foreign_key') for field in table_fields)
-            if has_primary_key:
-                tables_with_primary_key += 1
-            if has_foreign_key:
-                tables_with_foreign_key += 1
+        # Number of key fields per table; a table has a key if it is non-zero
+        pk_per_table = np.bincount(field_table_ids, weights=field_is_pk, minlength=num_tables)
+        fk_per_table = np.bincount(field_table_ids, weights=field_is_fk, minlength=num_tables)
+        tables_with_primary_key = int(np.count_nonzero(pk_per_table))
+        tables_with_foreign_key = int(np.count_nonzero(fk_per_table))
 
         # Split the 'keys_presence' weight between primary key and foreign key
         primary_key_score = (tables_with_primary_key / num_tables) * (weights['keys_presence'] / 2)
@@ -213,51 +550,36 @@ def score_gen_ai(
         logger.error("No tables found in schema.")
         keys_presence_score = 0
 
-    # 5) Field Name Similarity Metric
-    field_names = [entry['column_name'] for entry in schema]
-    field_descriptions_map = {}
-    field_table_map = {}
-
-    for entry in schema:
-        desc_val = entry.get('description')
-        desc_str = desc_val.strip() if desc_val and isinstance(desc_val, str) else ''
-        field_descriptions_map[entry['column_name']] = desc_str
-        field_table_map[entry['column_name']] = entry['table_name']
-
+    # 5) Field Name Similarity Metric. Only fields of the same table are
+    # compared, so the confusion rate is over the same-table pairs.
     similar_pairs = []
-
-    if len(field_names) > 1:
-        # Encode each field name once
-        name_to_embedding = {
-            name: model.encode(name, convert_to_tensor=True) for name in field_names
-        }
-
-        for name1, name2 in combinations(field_names, 2):
-            # Only check fields in the same table
-            if field_table_map[name1] != field_table_map[name2]:
+    total_pairs = sum(len(indices) * (len(indices) - 1) // 2 for indices in table_field_indices)
+
+    if total_pairs > 0:
+        if similarity_threshold > 1.0:
+            # No cosine similarity exceeds 1, so no pair can match
+            candidate_pairs = ()
+        elif similarity_threshold == 1.0:
+            # Only identical names are that similar: no embeddings needed
+            candidate_pairs = _duplicate_name_pairs(field_names, table_field_indices)
+        else:
+            candidate_pairs = _similar_name_pairs(
+                field_names, table_field_indices, similarity_threshold
+            )
+
+        for idx1, idx2 in candidate_pairs:
+            desc1 = field_descriptions[idx1]
+            desc2 = field_descriptions[idx2]
+            if desc1 and desc2 and desc1 != desc2:
+                # Different descriptions => user can differentiate => no penalty
                 continue
+            similar_pairs.append((field_names[idx1], field_names[idx2]))
+            similarity_penalized_mask[idx1] = True
+            similarity_penalized_mask[idx2] = True
 
-            sim_score = util.pytorch_cos_sim(
-                name_to_embedding[name1],
-                name_to_embedding[name2]
-            ).item()
-
-            if sim_score >= similarity_threshold:
-                desc1 = field_descriptions_map[name1]
-                desc2 = field_descriptions_map[name2]
-                if desc1 and desc2 and desc1 != desc2:
-                    # Different descriptions => user can differentiate => no penalty
-                    continue
-                else:
-                    similar_pairs.append((name1, name2))
-                    similarity_penalized_fields.add(name1)
-                    similarity_penalized_fields.add(name2)
-
-        total_pairs = (total_fields * (total_fields - 1)) / 2
-        confusion_rate = len(similar_pairs) / total_pairs if total_pairs > 0 else 0
+        confusion_rate = len(similar_pairs) / total_pairs
     else:
-        # Only one field => no pairs
-        total_pairs = 1
+        # No table has two fields => no pairs
         confusion_rate = 0
 
     field_name_similarity_score = (1 - confusion_rate) * weights['field_name_similarity']
@@ -296,9 +618,9 @@ def score_gen_ai(
     # Return Detailed Info
 
     penalized_fields = {
-        'NonMeaningful': list(non_meaningful_fields),
-        'NonMeaningful_NoDescription': list(non_meaningful_no_description),
-        'Similar_Undifferentiated': list(similarity_penalized_fields),
+        'NonMeaningful': _flagged_names(field_names, non_meaningful_mask),
+        'NonMeaningful_NoDescription': _flagged_names(field_names, non_meaningful_no_description_mask),
+        'Similar_Undifferentiated': _flagged_names(field_names, similarity_penalized_mask),
     }
 
     detailed_scores = {
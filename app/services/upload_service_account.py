@@ -1,25 +1,22 @@
-from flask import Blueprint, request, session, jsonify
+from flask import Blueprint, current_app, request, session, jsonify
 from google.oauth2 import service_account
 
-import app
+from .bigquery_service import store_service_account
 
 upload_bp = Blueprint("upload_bp", __name__)
 
-@upload_bp.route("/upload_service_account", methods=["POST", "OPTIONS"])
+@upload_bp.route("/upload_service_account", methods=["POST"])
 def upload_service_account():
-    if request.method == "OPTIONS":
-        # Let Flask-CORS handle this normally, but you can also do:
-        return '', 204
-
+    # Oversized (413) or malformed (400) bodies are answered as such
+    service_account_json = request.get_json(force=True)
     try:
-        service_account_json = request.get_json(force=True)
         # Validate
-        creds = service_account.Credentials.from_service_account_info(service_account_json)
-        # Store in session
-        session["service_account_json"] = service_account_json
-        print(creds)
+        service_account.Credentials.from_service_account_info(service_account_json)
+        # Keep the key server-side; the session cookie only carries its ID
+        session["sa_id"] = store_service_account(service_account_json)
+        session.pop("service_account_json", None)
         return jsonify({"message": "Service account uploaded successfully."}), 200
  
     except Exception as e:
-        app.logger.error("Exception occurred", exc_info=True)
+        current_app.logger.exception("Exception occurred")
         return jsonify({"error": "An internal error has occurred."}), 500
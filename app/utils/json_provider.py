@@ -0,0 +1,20 @@
+"""orjson-backed JSON provider for Flask"""
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that parses and serializes with orjson, so every
+    jsonify(...) and request.get_json() call goes through it.
+    """
+
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string; Flask formatting kwargs are ignored."""
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON str or bytes document."""
+        return orjson.loads(s)
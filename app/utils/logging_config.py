@@ -1,12 +1,22 @@
 """logger service"""
 import logging
 
+# Set once the root logger has been configured for this process
+_CONFIGURED = False
+
+
 def configure_logging(app):
-    """function configuring logginf"""
-    # Basic logging configuration
-    logging.basicConfig(level=logging.INFO)
-    logger = logging.getLogger(__name__)
-    app.logger.handlers = logger.handlers
-    app.logger.setLevel(logger.level)
+    """
+    Configure the root logger on the first call only, so creating several
+    apps in one process does not stack handlers. The app logger has no
+    handlers of its own and propagates to the root logger's.
+    """
+    global _CONFIGURED  # pylint: disable=global-statement
+    if not _CONFIGURED:
+        # Basic logging configuration
+        logging.basicConfig(level=logging.INFO)
+        _CONFIGURED = True
+    app.logger.handlers.clear()
+    app.logger.setLevel(logging.INFO)
 
 logger = logging.getLogger(__name__)
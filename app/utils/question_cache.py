@@ -0,0 +1,124 @@
+"""disk-backed cache of generated questions, keyed by a hash of the SQL"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from .logging_config import logger
+
+# SQLite file shared by every worker process on the host, so translations
+# survive restarts. Override with QUESTION_CACHE_PATH.
+QUESTION_CACHE_PATH = os.getenv(
+    "QUESTION_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "data_omni_questions.sqlite3")
+)
+
+# How long a generated question is reused, in seconds
+QUESTION_CACHE_TTL = 30 * 86400
+
+# Expired rows are deleted by a write at most this often, in seconds, so
+# the file does not grow without bound
+PURGE_INTERVAL = 3600
+
+# Keys per SELECT ... IN (...) lookup, well under SQLite's variable limit
+LOOKUP_BATCH = 500
+
+# sqlite3 connections must not be shared between threads
+_local = threading.local()
+
+# time.time() after which the next write purges expired rows
+_next_purge = 0.0
+_purge_lock = threading.Lock()
+
+
+def _connection() -> sqlite3.Connection:
+    """Return this thread's connection, creating the table on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(QUESTION_CACHE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            " key TEXT PRIMARY KEY,"
+            " question TEXT NOT NULL,"
+            " expires REAL NOT NULL)"
+        )
+        _local.conn = conn
+    return conn
+
+
+def query_key(query: str) -> str:
+    """
+    Cache key of a SQL query. Only leading and trailing whitespace is
+    ignored: whitespace and case inside the query can be part of a string
+    literal, and query history already groups runs by exact text.
+    """
+    return hashlib.blake2b(query.strip().encode(), digest_size=16).hexdigest()
+
+
+def get_question(query: str):
+    """Return the cached question for a query, or None."""
+    try:
+        row = _connection().execute(
+            "SELECT question FROM questions WHERE key = ? AND expires > ?",
+            (query_key(query), time.time())
+        ).fetchone()
+    except sqlite3.Error as exc:
+        logger.warning("Question cache read failed: %s", exc)
+        return None
+    return row[0] if row else None
+
+
+def _purge_due(now: float) -> bool:
+    """True for one caller once every PURGE_INTERVAL seconds."""
+    global _next_purge  # pylint: disable=global-statement
+    with _purge_lock:
+        if now < _next_purge:
+            return False
+        _next_purge = now + PURGE_INTERVAL
+        return True
+
+
+def set_question(query: str, question: str) -> None:
+    """
+    Store the question generated for a query, deleting expired rows first
+    if the last purge was more than PURGE_INTERVAL seconds ago.
+    """
+    now = time.time()
+    try:
+        conn = _connection()
+        if _purge_due(now):
+            conn.execute("DELETE FROM questions WHERE expires <= ?", (now,))
+        conn.execute(
+            "INSERT OR REPLACE INTO questions (key, question, expires) VALUES (?, ?, ?)",
+            (query_key(query), question, now + QUESTION_CACHE_TTL)
+        )
+    except sqlite3.Error as exc:
+        logger.warning("Question cache write failed: %s", exc)
+
+
+def get_questions(queries) -> dict:
+    """
+    Return the cached questions for a batch of queries as a dict keyed by
+    query; queries without a cached question are left out.
+    """
+    keys = {query_key(query): query for query in queries}
+    questions = {}
+    key_list = list(keys)
+    now = time.time()
+    try:
+        conn = _connection()
+        for start in range(0, len(key_list), LOOKUP_BATCH):
+            batch = key_list[start:start + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, question FROM questions WHERE key IN ({placeholders}) AND expires > ?",
+                (*batch, now)
+            )
+            for key, question in rows:
+                questions[keys[key]] = question
+    except sqlite3.Error as exc:
+        logger.warning("Question cache read failed: %s", exc)
+    return questions
@@ -0,0 +1,22 @@
+"""helpers for streaming JSON responses"""
+import orjson
+
+
+def iter_json_array(items, key=None):
+    """
+    Encode an iterable of JSON-serializable objects as a JSON array, one
+    chunk per item, so a response can be streamed without materializing
+    the whole list or its serialized form in memory.
+
+    With ``key`` set, the array is wrapped in an object as ``{key: [...]}``.
+    """
+    if key is not None:
+        yield b"{" + orjson.dumps(key) + b":"
+    yield b"["
+    separator = b""
+    for item in items:
+        yield separator + orjson.dumps(item)
+        separator = b","
+    yield b"]"
+    if key is not None:
+        yield b"}"
@@ -3,4 +3,15 @@ import os
 class Config:
     # Add any configuration variables you might need
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    # Largest request body (in bytes) accepted by any endpoint. Werkzeug
+    # enforces it while reading, so chunked bodies without a Content-Length
+    # are bounded too; oversized requests get a 413.
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_JSON_BODY_BYTES', '1000000'))
+    # Concurrent BigQuery API calls made by /bigquery_info. Kept modest to
+    # stay inside the per-project concurrent request quota; lower it for
+    # projects that run into rate limits
+    BIGQUERY_MAX_WORKERS = int(os.getenv('BIGQUERY_MAX_WORKERS', '10'))
+    # Concurrent OpenAI requests made to translate one batch of queries into
+    # questions; lower it for API keys with tight rate limits
+    OPENAI_QUESTION_WORKERS = int(os.getenv('OPENAI_QUESTION_WORKERS', '16'))
     # You can add more configurations like DEBUG, DATABASE_URI, etc.
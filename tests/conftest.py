@@ -0,0 +1,23 @@
+"""shared pytest fixtures"""
+import os
+
+import pytest
+
+# openai_service builds its client at import time, which requires a key
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app import create_app  # pylint: disable=wrong-import-position
+
+
+@pytest.fixture
+def app():
+    """App with a small body limit, so the 413 paths are cheap to hit."""
+    flask_app = create_app()
+    flask_app.config.update(TESTING=True, MAX_CONTENT_LENGTH=1024)
+    return flask_app
+
+
+@pytest.fixture
+def client(app):  # pylint: disable=redefined-outer-name
+    """Test client of the app fixture."""
+    return app.test_client()
@@ -0,0 +1,315 @@
+"""tests for bigquery_service, against a stub BigQuery client"""
+# pylint: disable=protected-access
+from types import SimpleNamespace
+
+import pyarrow as pa
+import pytest
+from google.api_core.exceptions import BadRequest
+from google.cloud import bigquery
+
+from app.services import bigquery_service
+from app.services.bigquery_service import (
+    QueryRow,
+    get_bigquery_info,
+    get_columns,
+    get_queries,
+    human_readable_size,
+)
+
+
+class _Result:
+    """Stand-in for a RowIterator: iterable rows plus an Arrow table."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __iter__(self):
+        return (SimpleNamespace(**row) for row in self.table.to_pylist())
+
+    def to_arrow(self, create_bqstorage_client=True):  # pylint: disable=unused-argument
+        return self.table
+
+
+class _Job:
+    """Stand-in for a finished QueryJob."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def result(self, page_size=None):  # pylint: disable=unused-argument
+        return _Result(self.table)
+
+
+class _Client:
+    """
+    Stand-in for a bigquery.Client. Every query answers with the Arrow
+    table `respond(sql)` returns; the SQL texts are recorded in `queries`.
+    `tables` maps dataset ID -> table ID -> schema for the listing and
+    get_table calls, whose table references are recorded in `fetched`.
+    """
+
+    def __init__(self, project="proj", respond=None, tables=None):
+        self.project = project
+        self.queries = []
+        self.fetched = []
+        self.tables = tables or {}
+        self._respond = respond or (lambda sql: pa.table({}))
+
+    def query(self, sql, job_config=None):  # pylint: disable=unused-argument
+        self.queries.append(sql)
+        return _Job(self._respond(sql))
+
+    def list_datasets(self, page_size=None):  # pylint: disable=unused-argument
+        return [SimpleNamespace(dataset_id=dataset_id) for dataset_id in self.tables]
+
+    def list_tables(self, dataset_id, page_size=None):  # pylint: disable=unused-argument
+        return [SimpleNamespace(table_id=table_id) for table_id in self.tables[dataset_id]]
+
+    def dataset(self, dataset_id):
+        return SimpleNamespace(table=lambda table_id: (dataset_id, table_id))
+
+    def get_table(self, table_ref):
+        self.fetched.append(table_ref)
+        dataset_id, table_id = table_ref
+        return SimpleNamespace(
+            project=self.project,
+            dataset_id=dataset_id,
+            table_id=table_id,
+            schema=self.tables[dataset_id][table_id],
+        )
+
+
+def _history_table():
+    return pa.table({
+        "query": ["SELECT 1", "SELECT 2"],
+        "query_count": [5, 2],
+        "job_type": ["QUERY", "QUERY"],
+        "statement_type": ["SELECT", "SELECT"],
+        "creation_time": [None, None],
+        "avg_total_bytes_processed": [10.0, 20.0],
+        "avg_execution_time": [None, 3.0],
+    })
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test without cached results."""
+    get_queries.cache_clear()
+    bigquery_service._fetch_project_constraints.cache_clear()
+    yield
+    get_queries.cache_clear()
+    bigquery_service._fetch_project_constraints.cache_clear()
+
+
+def test_get_queries_builds_query_rows():
+    rows = get_queries(_Client(respond=lambda sql: _history_table()), days=7)
+    assert rows == [
+        QueryRow("SELECT 1", 5, "QUERY", "SELECT", None, 10.0, None),
+        QueryRow("SELECT 2", 2, "QUERY", "SELECT", None, 20.0, 3.0),
+    ]
+
+
+def test_get_queries_is_cached_per_client():
+    client = _Client(respond=lambda sql: _history_table())
+    assert get_queries(client) is get_queries(client)
+    assert len(client.queries) == 1
+
+
+def test_get_queries_is_not_shared_between_principals():
+    mine = _Client(respond=lambda sql: _history_table())
+    theirs = _Client(respond=lambda sql: _history_table())
+    get_queries(mine)
+    get_queries(theirs)
+    # Same project, different principals: each runs its own query
+    assert len(mine.queries) == len(theirs.queries) == 1
+
+
+@pytest.mark.parametrize("num_bytes, text", [
+    (0, "0.00 B"),
+    (1023, "1023.00 B"),
+    (1024, "1.00 KB"),
+    (1234, "1.21 KB"),
+    (5 * 1024 ** 3, "5.00 GB"),
+    (2 * 1024 ** 6, "2048.00 PB"),
+])
+def test_human_readable_size(num_bytes, text):
+    assert human_readable_size(num_bytes) == text
+
+
+def test_credential_key_depends_on_the_private_key():
+    sa_json = {"client_email": "sa@p.iam.gserviceaccount.com", "private_key_id": "k1"}
+    real = bigquery_service._credential_key({**sa_json, "private_key": "real"})
+    forged = bigquery_service._credential_key({**sa_json, "private_key": "forged"})
+    assert real != forged
+    assert real == bigquery_service._credential_key({**sa_json, "private_key": "real"})
+
+
+@pytest.mark.parametrize("table_id, prefix", [
+    ("events_20240101", "events_"),
+    ("a_b_20991231", "a_b_"),
+    ("events", None),
+    ("events_2024010", None),
+    ("events20240101", None),
+    ("events_2024010x", None),
+])
+def test_shard_prefix(table_id, prefix):
+    assert bigquery_service._shard_prefix(table_id) == prefix
+
+
+def test_bigquery_info_key_differs_per_principal():
+    first, second = _Client("proj"), _Client("proj")
+    key = bigquery_service._bigquery_info_key
+    assert key(first, 10) != key(second, 10)
+    # The worker count does not change the result
+    assert key(first, 10) == key(first, 3)
+
+
+def test_invalidate_bigquery_info_only_drops_own_entries():
+    mine, theirs = _Client("proj"), _Client("proj")
+    cache = bigquery_service._bigquery_info_cache
+    mine_key = bigquery_service._bigquery_info_key(mine, 10)
+    theirs_key = bigquery_service._bigquery_info_key(theirs, 10)
+    cache[mine_key] = {"project_id": "proj"}
+    cache[theirs_key] = {"project_id": "proj"}
+    try:
+        assert bigquery_service.invalidate_bigquery_info(mine) == 1
+        assert mine_key not in cache
+        assert theirs_key in cache
+    finally:
+        cache.clear()
+
+
+def _field_paths_table(rows):
+    """COLUMN_FIELD_PATHS result for (table_name, field_path, data_type) rows."""
+    table_names, field_paths, data_types = zip(*rows) if rows else ((), (), ())
+    return pa.table({
+        "table_name": list(table_names),
+        "field_path": list(field_paths),
+        "data_type": list(data_types),
+        "description": [None] * len(rows),
+    })
+
+
+def test_get_columns_orders_by_schema_position_and_maps_types():
+    rows = [
+        ("orders", "order_id", "INT64"),
+        ("orders", "tags", "ARRAY<STRING>"),
+        ("orders", "customer.name", "STRING(100)"),
+        ("orders", "paid", "BOOL"),
+    ]
+    client = _Client(respond=lambda sql: _field_paths_table(rows))
+    columns = get_columns(client, "shop", ["orders", "order_view"])
+
+    assert [
+        (field["field_path"], field["data_type"]) for field in columns["orders"]
+    ] == [
+        ("order_id", "INTEGER"),
+        ("tags", "STRING"),
+        ("customer.name", "STRING"),
+        ("paid", "BOOLEAN"),
+    ]
+    # The row order the caller relies on comes from the query itself
+    assert "ORDER BY" in client.queries[0]
+    assert "ordinal_position" in client.queries[0]
+    # No rows (e.g. a view): left for the get_table fallback
+    assert "order_view" not in columns
+
+
+def test_get_columns_returns_none_when_information_schema_fails():
+    def respond(sql):
+        raise BadRequest("INFORMATION_SCHEMA unavailable")
+
+    assert get_columns(_Client(respond=respond), "shop", ["orders"]) is None
+
+
+def test_get_bigquery_info_assembles_tables_keys_and_fallbacks():
+    def respond(sql):
+        if "KEY_COLUMN_USAGE" in sql:
+            return pa.table({
+                "DATASET_ID": ["shop", "shop"],
+                "TABLE_NAME": ["orders", "orders"],
+                "COLUMN_NAME": ["order_id", "customer_id"],
+                "CONSTRAINT_NAME": ["orders_pk", "orders_customers_fk"],
+                "KEY_KIND": ["primary_keys", "foreign_keys"],
+            })
+        return _field_paths_table([
+            ("events_20240101", "event_id", "STRING"),
+            ("orders", "order_id", "INT64"),
+            ("orders", "customer_id", "INT64"),
+        ])
+
+    client = _Client(respond=respond, tables={"shop": {
+        "events_20240101": None,
+        "events_20240102": None,
+        "orders": None,
+        "order_view": [bigquery.SchemaField("total", "FLOAT", description="Order total")],
+    }})
+    info = get_bigquery_info(client, max_workers=2)
+
+    assert info["project_id"] == "proj"
+    [dataset] = info["datasets"]
+    assert dataset["dataset_id"] == "shop"
+    tables = {table["table_id"]: table["fields"] for table in dataset["tables"]}
+    # One entry per shard family, in listing order
+    assert list(tables) == ["events_*", "orders", "order_view"]
+    assert [
+        (field["field_path"], field["is_primary_key"], field["is_foreign_key"])
+        for field in tables["orders"]
+    ] == [("order_id", True, False), ("customer_id", False, True)]
+    # Only the table INFORMATION_SCHEMA had no fields for is read directly
+    assert client.fetched == [("shop", "order_view")]
+    assert tables["order_view"][0]["data_type"] == "FLOAT"
+    assert tables["order_view"][0]["description"] == "Order total"
+
+
+def _key_columns_table(rows):
+    """KEY_COLUMN_USAGE union result for (dataset, table, column, constraint, kind) rows."""
+    columns = ("DATASET_ID",) + bigquery_service._KEY_COLUMN_FIELDS
+    return pa.table({name: [row[i] for row in rows] for i, name in enumerate(columns)})
+
+
+def test_fetch_project_constraints_classifies_per_dataset():
+    rows = [
+        ("shop", "orders", "order_id", "orders_pk", "primary_keys"),
+        ("shop", "orders", "customer_id", "orders_customers_fk", "foreign_keys"),
+        ("shop", "orders", "store_id", "orders_stores_fk", "foreign_keys"),
+        ("crm", "customers", "customer_id", "pk_customers", "primary_keys"),
+    ]
+    client = _Client(respond=lambda sql: _key_columns_table(rows))
+    constraints = bigquery_service._fetch_project_constraints(client, ["shop", "crm", "empty"])
+
+    assert constraints["shop"] == {
+        "primary_keys": {"orders": {"order_id"}},
+        "foreign_keys": {"orders": {"customer_id", "store_id"}},
+    }
+    assert constraints["crm"] == {
+        "primary_keys": {"customers": {"customer_id"}},
+        "foreign_keys": {},
+    }
+    assert constraints["empty"] == {"primary_keys": {}, "foreign_keys": {}}
+    # One job for all datasets, classified and filtered in SQL
+    [sql] = client.queries
+    assert sql.count("UNION ALL") == 2
+    assert sql.count(bigquery_service._KEY_FILTER_SQL) == 3
+    assert "KEY_KIND" in sql
+
+
+def test_fetch_project_constraints_batches_datasets(monkeypatch):
+    monkeypatch.setattr(bigquery_service, "CONSTRAINT_QUERY_BATCH", 2)
+    client = _Client(respond=lambda sql: _key_columns_table([]))
+    bigquery_service._fetch_project_constraints(client, ["a", "b", "c"])
+    assert len(client.queries) == 2
+
+
+@pytest.mark.parametrize("data_type, legacy", [
+    ("INT64", "INTEGER"),
+    ("FLOAT64", "FLOAT"),
+    ("BOOL", "BOOLEAN"),
+    ("STRING(10)", "STRING"),
+    ("NUMERIC(10, 2)", "NUMERIC"),
+    ("ARRAY<INT64>", "INTEGER"),
+    ("RANGE<DATE>", "RANGE"),
+    ("TIMESTAMP", "TIMESTAMP"),
+])
+def test_legacy_type_name(data_type, legacy):
+    assert bigquery_service._legacy_type_name(data_type) == legacy
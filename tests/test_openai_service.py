@@ -0,0 +1,43 @@
+"""tests for batch question generation, with OpenAI stubbed out"""
+import threading
+
+from app.services import openai_service
+
+
+def _stub_translate(monkeypatch):
+    """Replace the OpenAI call; returns the list of queries it was sent."""
+    sent = []
+    lock = threading.Lock()
+
+    def translate(query):
+        with lock:
+            sent.append(query)
+        return f"question for {query}"
+
+    monkeypatch.setattr(openai_service, "_translate_query", translate)
+    return sent
+
+
+def test_questions_follow_input_order(monkeypatch):
+    _stub_translate(monkeypatch)
+    monkeypatch.setattr(openai_service, "get_questions", lambda queries: {})
+    queries = [f"SELECT {i}" for i in range(20)]
+    questions = list(openai_service.generate_natural_language_questions(queries, max_workers=4))
+    assert questions == [f"question for {query}" for query in queries]
+
+
+def test_cached_and_repeated_queries_are_not_sent(monkeypatch):
+    sent = _stub_translate(monkeypatch)
+    monkeypatch.setattr(
+        openai_service, "get_questions", lambda queries: {"SELECT 1": "cached one"}
+    )
+    queries = ["SELECT 2", "SELECT 1", "SELECT 2"]
+    questions = list(openai_service.generate_natural_language_questions(queries, max_workers=4))
+    assert questions == ["question for SELECT 2", "cached one", "question for SELECT 2"]
+    assert sent == ["SELECT 2"]
+
+
+def test_empty_batch_yields_nothing(monkeypatch):
+    sent = _stub_translate(monkeypatch)
+    assert not list(openai_service.generate_natural_language_questions([], max_workers=4))
+    assert not sent
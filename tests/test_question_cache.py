@@ -0,0 +1,65 @@
+"""tests for the on-disk question cache"""
+import threading
+
+import pytest
+
+from app.utils import question_cache
+from app.utils.question_cache import get_question, get_questions, query_key, set_question
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch):
+    """Point the cache at a fresh file, with fresh per-thread connections."""
+    monkeypatch.setattr(question_cache, "QUESTION_CACHE_PATH", str(tmp_path / "questions.sqlite3"))
+    monkeypatch.setattr(question_cache, "_local", threading.local())
+    monkeypatch.setattr(question_cache, "_next_purge", 0.0)
+
+
+def _row_count():
+    return question_cache._connection().execute(  # pylint: disable=protected-access
+        "SELECT COUNT(*) FROM questions"
+    ).fetchone()[0]
+
+
+def test_query_key_ignores_surrounding_whitespace():
+    assert query_key("  SELECT 1\n") == query_key("SELECT 1")
+
+
+def test_query_key_keeps_whitespace_and_case_inside_the_query():
+    assert query_key("SELECT 'a  b'") != query_key("SELECT 'a b'")
+    assert query_key("SELECT 'A'") != query_key("SELECT 'a'")
+
+
+def test_set_and_get_question():
+    assert get_question("SELECT 1") is None
+    set_question("SELECT 1", "What is one?")
+    assert get_question("SELECT 1") == "What is one?"
+
+
+def test_get_questions_returns_only_cached_queries():
+    set_question("SELECT 1", "one")
+    set_question("SELECT 2", "two")
+    assert get_questions(["SELECT 1", "SELECT 2", "SELECT 3"]) == {
+        "SELECT 1": "one",
+        "SELECT 2": "two",
+    }
+
+
+def test_get_questions_spans_several_lookup_batches():
+    queries = [f"SELECT {i}" for i in range(question_cache.LOOKUP_BATCH + 10)]
+    for query in queries:
+        set_question(query, query.lower())
+    assert get_questions(queries) == {query: query.lower() for query in queries}
+
+
+def test_expired_questions_are_ignored_and_purged(monkeypatch):
+    monkeypatch.setattr(question_cache, "QUESTION_CACHE_TTL", -1)
+    set_question("SELECT 1", "one")
+    assert get_question("SELECT 1") is None
+    assert get_questions(["SELECT 1"]) == {}
+
+    # The next write after PURGE_INTERVAL deletes the expired row
+    monkeypatch.setattr(question_cache, "QUESTION_CACHE_TTL", 3600)
+    monkeypatch.setattr(question_cache, "_next_purge", 0.0)
+    set_question("SELECT 2", "two")
+    assert _row_count() == 1
@@ -0,0 +1,52 @@
+"""tests for request validation in the routes"""
+import pytest
+
+from app.routes.queries_routes import _interval_days
+
+
+@pytest.mark.parametrize("interval, days", [
+    ("90 day", 90),
+    ("7 days", 7),
+    (" 30 DAY ", 30),
+    ("14", 14),
+    ("90 day; DROP TABLE x", None),
+    ("12345 day", None),
+    ("day", None),
+    ("", None),
+])
+def test_interval_days(interval, days):
+    assert _interval_days(interval) == days
+
+
+def test_queries_rejects_malformed_interval(client):
+    response = client.get("/queries", query_string={"time_interval": "1 week"})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/score_schema", "/generate_sql", "/upload_service_account"])
+def test_oversized_body_is_413(client, path):
+    response = client.post(path, json={"schema": ["x" * 2048]})
+    assert response.status_code == 413
+    assert response.get_json()["error"] == "Payload Too Large"
+
+
+@pytest.mark.parametrize("path", ["/score_schema", "/generate_sql"])
+def test_non_json_body_is_415(client, path):
+    response = client.post(path, data="schema", content_type="text/plain")
+    assert response.status_code == 415
+
+
+def test_score_schema_malformed_json_is_400(client):
+    response = client.post("/score_schema", data="{", content_type="application/json")
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("schema", [{"column_name": "id"}, []])
+def test_score_schema_rejects_non_list_or_empty_schema(client, schema):
+    response = client.post("/score_schema", json={"schema": schema})
+    assert response.status_code == 422
+
+
+def test_score_schema_without_schema_is_400(client):
+    response = client.post("/score_schema", json={"weights_override": {}})
+    assert response.status_code == 400
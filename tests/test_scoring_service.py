@@ -0,0 +1,166 @@
+"""tests for scoring_service, with the spaCy and embedding models stubbed out"""
+# pylint: disable=protected-access
+import numpy as np
+import pytest
+from cachetools import LRUCache
+
+from app.services import scoring_service
+
+
+class _StubModel:
+    """
+    Stand-in for the SentenceTransformer: every distinct name gets its own
+    unit vector, except that names listed in `aliases` share the vector of
+    the name they map to (a cosine similarity of 1).
+    """
+
+    def __init__(self, aliases=None):
+        self.aliases = aliases or {}
+        self.encoded = []
+        self._slots = {}
+
+    def encode(self, names, **kwargs):  # pylint: disable=unused-argument
+        self.encoded.extend(names)
+        vectors = np.zeros((len(names), 64), dtype=np.float32)
+        for row, name in enumerate(names):
+            canonical = self.aliases.get(name, name)
+            vectors[row, self._slots.setdefault(canonical, len(self._slots))] = 1.0
+        return vectors
+
+
+@pytest.fixture
+def stub_models(monkeypatch):
+    """
+    Install a stub embedding model (returned, so tests can set aliases) and
+    treat every name that passes the cheap checks as meaningful.
+    """
+    model = _StubModel()
+    monkeypatch.setattr(scoring_service, "get_sentence_model", lambda: model)
+    monkeypatch.setattr(scoring_service, "_embedding_cache", LRUCache(maxsize=1024))
+    monkeypatch.setattr(
+        scoring_service,
+        "_name_features",
+        lambda names: dict.fromkeys(names, scoring_service._POS_ONLY)
+    )
+    return model
+
+
+def _schema(tables, descriptions=None):
+    """Schema entries for {table: [column, ...]}, typed and without keys."""
+    descriptions = descriptions or {}
+    return [
+        {
+            "table_name": table,
+            "column_name": column,
+            "data_type": "STRING",
+            "description": descriptions.get(column),
+        }
+        for table, columns in tables.items()
+        for column in columns
+    ]
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("user id", True),
+    ("value", True),
+    ("col 1", False),
+    ("field12", False),
+    ("unknown", False),
+    ("abc", False),
+    ("2024 01", False),
+    ("1_000", False),
+])
+def test_needs_spacy_check(name, expected):
+    assert scoring_service._needs_spacy_check(name) is expected
+
+
+def test_confusion_rate_is_over_same_table_pairs(stub_models):
+    stub_models.aliases = {"customer_name": "client_name", "order_total": "order_sum"}
+    schema = _schema({
+        "orders": ["order_total", "order_sum"],
+        "customers": ["customer_name", "client_name", "signup_date"],
+    })
+    scores = scoring_service.score_gen_ai(schema)
+    # 1 + 3 same-table pairs, two of them similar; the 10 pairs of the
+    # whole schema are not the denominator
+    assert scores["Field Name Similarity Score"] == pytest.approx((1 - 2 / 4) * 20)
+
+
+def test_similar_names_in_different_tables_are_not_compared(stub_models):
+    stub_models.aliases = {"customer_name": "client_name"}
+    schema = _schema({"orders": ["customer_name"], "customers": ["client_name"]})
+    scores = scoring_service.score_gen_ai(schema)
+    assert scores["Field Name Similarity Score"] == 20
+    assert not stub_models.encoded
+
+
+def test_duplicate_name_pairs_stay_within_tables():
+    field_names = ["id", "name", "id", "id", "name"]
+    table_field_indices = [[0, 1, 2], [3, 4]]
+    pairs = list(scoring_service._duplicate_name_pairs(field_names, table_field_indices))
+    assert pairs == [(0, 2)]
+
+
+def test_duplicate_name_pairs_lists_every_pair_of_a_repeated_name():
+    pairs = list(scoring_service._duplicate_name_pairs(["a", "a", "a"], [[0, 1, 2]]))
+    assert pairs == [(0, 1), (0, 2), (1, 2)]
+
+
+def test_threshold_of_one_matches_duplicates_without_the_model(stub_models):
+    stub_models.aliases = {"client_name": "customer_name"}
+    schema = _schema({"customers": ["customer_name", "client_name", "customer_name"]})
+    scores = scoring_service.score_gen_ai(schema, similarity_threshold=1.0)
+    assert scores["Penalized Fields"]["Similar_Undifferentiated"] == ["customer_name"]
+    assert scores["Field Name Similarity Score"] == pytest.approx((1 - 1 / 3) * 20)
+    assert not stub_models.encoded
+
+
+def test_threshold_above_one_matches_nothing(stub_models):
+    schema = _schema({"customers": ["customer_name", "customer_name"]})
+    scores = scoring_service.score_gen_ai(schema, similarity_threshold=1.5)
+    assert scores["Field Name Similarity Score"] == 20
+    assert not stub_models.encoded
+
+
+def test_threshold_below_one_uses_embeddings(stub_models):
+    stub_models.aliases = {"client_name": "customer_name"}
+    schema = _schema({"customers": ["customer_name", "client_name", "signup_date"]})
+    scores = scoring_service.score_gen_ai(schema, similarity_threshold=0.9)
+    assert scores["Penalized Fields"]["Similar_Undifferentiated"] == [
+        "customer_name", "client_name"
+    ]
+
+
+def test_similar_names_with_different_descriptions_are_not_penalized(stub_models):
+    stub_models.aliases = {"client_name": "customer_name"}
+    schema = _schema(
+        {"customers": ["customer_name", "client_name"]},
+        descriptions={"customer_name": "Legal name", "client_name": "Display name"},
+    )
+    scores = scoring_service.score_gen_ai(schema)
+    assert scores["Penalized Fields"]["Similar_Undifferentiated"] == []
+
+
+def test_flagged_names_are_distinct_and_in_schema_order():
+    mask = np.array([True, False, True, True])
+    assert scoring_service._flagged_names(["b", "x", "a", "b"], mask) == ["b", "a"]
+
+
+def test_process_field_name_splits_on_dots_and_underscores():
+    assert scoring_service._process_field_name(" device.web_info__browser ") == (
+        "device web info browser"
+    )
+
+
+def test_only_names_passing_the_cheap_checks_reach_spacy(stub_models, monkeypatch):
+    analysed = []
+
+    def name_features(names):
+        analysed.extend(names)
+        return dict.fromkeys(names, scoring_service._POS_ONLY)
+
+    monkeypatch.setattr(scoring_service, "_name_features", name_features)
+    schema = _schema({"orders": ["order_id", "col1", "2024_01", "tmp"]})
+    scores = scoring_service.score_gen_ai(schema)
+    assert analysed == ["order id"]
+    assert scores["Penalized Fields"]["NonMeaningful"] == ["col1", "2024_01", "tmp"]
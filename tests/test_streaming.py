@@ -0,0 +1,32 @@
+"""tests for the streaming JSON helpers"""
+import orjson
+
+from app.utils.streaming import iter_json_array
+
+
+def test_iter_json_array_encodes_items_as_array():
+    items = [{"a": 1}, {"b": [2, 3]}, "c"]
+    assert orjson.loads(b"".join(iter_json_array(items))) == items
+
+
+def test_iter_json_array_empty():
+    assert b"".join(iter_json_array([])) == b"[]"
+
+
+def test_iter_json_array_wraps_in_key():
+    body = b"".join(iter_json_array(iter([1, 2]), key="schema"))
+    assert orjson.loads(body) == {"schema": [1, 2]}
+
+
+def test_iter_json_array_is_lazy():
+    consumed = []
+
+    def items():
+        for i in range(3):
+            consumed.append(i)
+            yield i
+
+    chunks = iter_json_array(items())
+    assert next(chunks) == b"["
+    assert next(chunks) == b"0"
+    assert consumed == [0]